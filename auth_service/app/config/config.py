@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -7,16 +8,55 @@ class Settings(BaseSettings):
     DB_USER: str
     DB_PASSWORD: str
     DATABASE_URL: str
+    ASYNC_DATABASE_URL: Optional[str] = None
     JWT_SECRET: str
     JWT_ALGORITHM: str
     JWT_EXP_MINUTES: int
     REDIS_HOST: str
     REDIS_PORT: int
-    RABBITMQ_HOST: str
-    RABBITMQ_PORT: int
-    RABBITMQ_USER: str
-    RABBITMQ_PASSWORD: str
+    # Unused since events moved to Redis Streams; kept optional so existing .env files still load
+    RABBITMQ_HOST: Optional[str] = None
+    RABBITMQ_PORT: Optional[int] = None
+    RABBITMQ_USER: Optional[str] = None
+    RABBITMQ_PASSWORD: Optional[str] = None
     JWT_ACCESS_TOKEN_EXPIRY_DAYS: int
+    TOKEN_REVOCATION_CHANNEL: str = "auth:token-revoked"
+    FOLLOW_COUNTS_RECONCILE_INTERVAL_SECONDS: int = 3600  # 0 disables the periodic job
+
+    # Connection pool, per engine and per worker process (each service runs a sync and an async engine)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg prepared statements kept per connection
+    DB_EXTERNAL_POOLER: bool = False  # PgBouncer-compatible mode: no prepared statements
+
+    # bcrypt worker pool; requests beyond workers + queue size get a 503
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 32
+
+    # Profile cache: per-process LRU in front of Redis
+    PROFILE_CACHE_TTL_SECONDS: int = 60
+    PROFILE_LOCAL_CACHE_SIZE: int = 10000
+    PROFILE_LOCAL_CACHE_TTL_SECONDS: float = 5.0
+
+    # Domain event bus on Redis Streams
+    EVENT_BUS_ENABLED: bool = True
+    EVENT_STREAM_MAXLEN: int = 100000  # approximate retention per event type, for replay
+    EVENT_PUBLISH_BATCH_SIZE: int = 100
+    EVENT_PUBLISH_FLUSH_INTERVAL: float = 0.05
+    EVENT_PUBLISH_QUEUE_SIZE: int = 10000
+    EVENT_CONSUMER_GROUP: str = "auth_service"
+    EVENT_CONSUMER_BATCH_SIZE: int = 100
+    EVENT_CONSUMER_BLOCK_MS: int = 5000
+    EVENT_CLAIM_IDLE_MS: int = 60000  # pending events idle this long are retried
+    EVENT_MAX_DELIVERIES: int = 5  # then the event is moved to <stream>:dead
+    EVENT_DEDUPE_TTL_SECONDS: int = 24 * 3600
+
+    # Transactional outbox relay to the event bus
+    OUTBOX_RELAY_BATCH_SIZE: int = 500
+    OUTBOX_RELAY_INTERVAL_SECONDS: float = 0.2
 
     class Config:
         env_file = ".env"
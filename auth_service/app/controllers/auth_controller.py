@@ -1,13 +1,14 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Security
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Security
 from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import SessionLocal, get_async_db
 from app.services import auth_service
 from app.schemas.auth_schema import (
     SignUpRequest, LoginRequest, TokenResponse,
     MessageResponse, ErrorResponse
 )
-from app.schemas.user_schema import UserProfileResponse, UserProfileUpdateRequest, FollowersListResponse, FollowingListResponse, UsernameCheckResponse
+from app.schemas.user_schema import UserProfileResponse, UserProfileUpdateRequest, FollowersListResponse, FollowingListResponse, UsernameCheckResponse, UserBatchRequest
 from app.schemas.follow_schema import  FollowCountsResponse
 from app.enums.role_enum import Role
 from app.guards.role_guard import require_role
@@ -34,8 +35,8 @@ def get_db():
     summary="Sign up a new user",
     description="Stores user in temporary table. On login, user is moved to permanent table."
 )
-def signup(payload: SignUpRequest, db: Session = Depends(get_db)):
-    return auth_service.signup_user(db, payload.name, payload.email, payload.password)
+async def signup(payload: SignUpRequest, db: AsyncSession = Depends(get_async_db)):
+    return await auth_service.signup_user(db, payload.name, payload.email, payload.password)
 
 
 @router.post(
@@ -45,8 +46,8 @@ def signup(payload: SignUpRequest, db: Session = Depends(get_db)):
     summary="Login a user",
     description="Login user and return access token. If in temp table, move to permanent table. Token reused if not expired."
 )
-def login(payload: LoginRequest, db: Session = Depends(get_db)):
-    return auth_service.login_user(db, payload.email, payload.password)
+async def login(payload: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    return await auth_service.login_user(db, payload.email, payload.password)
 
 
 @router.post(
@@ -102,6 +103,18 @@ def get_profile(user_id: str, credentials: HTTPAuthorizationCredentials = Securi
 
 
 
+@router.post(
+    "/users/batch",
+    response_model=List[UserProfileResponse],
+    responses={
+        401: {"model": ErrorResponse}
+    },
+    summary="Get many user profiles",
+    description="Returns the profiles for up to 100 user ids in one call, in the requested order. Unknown ids are omitted."
+)
+def get_profiles_batch(payload: UserBatchRequest, credentials: HTTPAuthorizationCredentials = Security(security), db: Session = Depends(get_db)):
+    return auth_service.get_user_profiles_batch(db, credentials.credentials, payload.ids)
+
 
 @router.post(
     "/me",
@@ -165,17 +178,29 @@ def unfollow_user(followed_id: int, credentials: HTTPAuthorizationCredentials =
     return auth_service.unfollow_user(db, credentials.credentials, followed_id)
 
 @router.get("/followers/{user_id}", response_model=FollowersListResponse, summary="Get followers for a user")
-def get_followers(user_id: int, credentials: HTTPAuthorizationCredentials = Security(security), db: Session = Depends(get_db)):
-    return auth_service.get_followers(db, credentials.credentials, user_id)
+async def get_followers(
+    user_id: int,
+    after_id: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=1000),
+    credentials: HTTPAuthorizationCredentials = Security(security),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await auth_service.get_followers(db, credentials.credentials, user_id, after_id=after_id, limit=limit)
 
 @router.get("/following/{user_id}", response_model=FollowingListResponse, summary="Get users a user is following")
-def get_following(user_id: int, credentials: HTTPAuthorizationCredentials = Security(security), db: Session = Depends(get_db)):
-    return auth_service.get_following(db, credentials.credentials, user_id)
+async def get_following(
+    user_id: int,
+    after_id: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=1000),
+    credentials: HTTPAuthorizationCredentials = Security(security),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await auth_service.get_following(db, credentials.credentials, user_id, after_id=after_id, limit=limit)
 
 
 @router.get("/follow-counts/{user_id}", response_model=FollowCountsResponse, summary="Get follower and following counts for a user")
-def get_follow_counts(user_id: int, credentials: HTTPAuthorizationCredentials = Security(security), db: Session = Depends(get_db)):
-    return auth_service.get_follow_counts(db, credentials.credentials, user_id)
+async def get_follow_counts(user_id: int, credentials: HTTPAuthorizationCredentials = Security(security), db: AsyncSession = Depends(get_async_db)):
+    return await auth_service.get_follow_counts(db, credentials.credentials, user_id)
 
 # RBAC Protected Routes
 
@@ -204,8 +229,8 @@ def mod_view(current_user=Depends(require_role(Role.MODERATOR, Role.ADMIN))):
     summary="Check if username exists",
     description="Returns true and user_id if the username exists"
 )
-def check_username(username: str, db: Session = Depends(get_db)):
-    return auth_service.check_username_exists(db, username)
+async def check_username(username: str, db: AsyncSession = Depends(get_async_db)):
+    return await auth_service.check_username_exists(db, username)
 
 
 @router.get(
@@ -224,9 +249,9 @@ def get_profile_by_username(username: str, db: Session = Depends(get_db)):
     summary="Get all user profiles (paginated)",
     description="Returns paginated list of user profiles"
 )
-def get_all_profiles(
+async def get_all_profiles(
     skip: int = 0,
     limit: int = 10,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return auth_service.get_all_user_profiles(db, skip=skip, limit=limit)
+    return await auth_service.get_all_user_profiles(db, skip=skip, limit=limit)
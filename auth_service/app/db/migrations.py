@@ -0,0 +1,38 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+# create_all() only creates missing tables, so columns and indexes added to
+# existing tables are applied here. Every statement must be idempotent.
+SCHEMA_UPDATES = [
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS followers_count INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS following_count INTEGER NOT NULL DEFAULT 0",
+    "CREATE INDEX IF NOT EXISTS ix_followers_followed_follower ON followers (followed_id, follower_id)",
+    "CREATE INDEX IF NOT EXISTS ix_followers_follower_created_at ON followers (follower_id, created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS ix_followers_followed_created_at ON followers (followed_id, created_at DESC)",
+]
+
+# Only run once, while the unique key is still missing: the dedupe scans the
+# whole table and must not repeat on every startup.
+FOLLOWERS_UNIQUE_KEY = "uq_followers_follower_followed"
+FOLLOWERS_UNIQUE_KEY_UPDATES = [
+    # Drop duplicate follows so the unique key can be built; counters are repaired by reconciliation
+    """
+    DELETE FROM followers a USING followers b
+    WHERE a.follower_id = b.follower_id AND a.followed_id = b.followed_id AND a.id > b.id
+    """,
+    f"CREATE UNIQUE INDEX IF NOT EXISTS {FOLLOWERS_UNIQUE_KEY} ON followers (follower_id, followed_id)",
+]
+
+
+def apply_schema_updates(engine: Engine):
+    with engine.begin() as conn:
+        for statement in SCHEMA_UPDATES:
+            conn.execute(text(statement))
+
+        has_unique_key = conn.execute(
+            text("SELECT 1 FROM pg_indexes WHERE tablename = 'followers' AND indexname = :name"),
+            {"name": FOLLOWERS_UNIQUE_KEY},
+        ).first()
+        if not has_unique_key:
+            for statement in FOLLOWERS_UNIQUE_KEY_UPDATES:
+                conn.execute(text(statement))
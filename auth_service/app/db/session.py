@@ -1,8 +1,26 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.config.config import settings
+from app.db.pool import engine_options, async_engine_options, instrument
 
 DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **engine_options())
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engine (asyncpg) for request handlers, derived from DATABASE_URL unless overridden
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or make_url(DATABASE_URL).set(drivername="postgresql+asyncpg"),
+    **async_engine_options()
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+instrument(engine, "sync")
+instrument(async_engine.sync_engine, "async")
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
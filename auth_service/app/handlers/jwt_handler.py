@@ -1,7 +1,7 @@
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
 from app.config.config import settings
-from app.handlers.redis_handler import redis_client
+from app.handlers.redis_handler import redis_client, store_session
 
 
 def create_access_token(data: dict):
@@ -13,6 +13,7 @@ def create_access_token(data: dict):
 
     if "sub" in to_encode:
         redis_client.setex(f"user:{to_encode['sub']}", timedelta(days=settings.JWT_ACCESS_TOKEN_EXPIRY_DAYS), token)
+    store_session(token, timedelta(days=settings.JWT_ACCESS_TOKEN_EXPIRY_DAYS))
 
     return token
 
@@ -0,0 +1,166 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+from prometheus_client import Counter
+from app.config.config import settings
+from app.handlers.redis_handler import redis_client
+from app.schemas.user_schema import UserProfileResponse
+
+logger = logging.getLogger(__name__)
+
+# Two layers: a small per-process LRU in front of Redis. Profiles are stored
+# under their id; usernames map to ids so both lookups share one entry.
+# Entries are compact JSON arrays in _FIELDS order.
+_FIELDS = ("id", "name", "username", "email", "bio", "profile_pic", "website", "gender", "role")
+
+PROFILE_CACHE_REQUESTS = Counter(
+    "profile_cache_requests_total",
+    "Profile cache lookups by layer and result",
+    ["layer", "result"],
+)
+
+
+def _id_key(user_id: int) -> str:
+    return f"profile:id:{user_id}"
+
+
+def _username_key(username: str) -> str:
+    return f"profile:username:{username}"
+
+
+def _encode(profile: UserProfileResponse) -> str:
+    return json.dumps([getattr(profile, f) for f in _FIELDS], separators=(",", ":"))
+
+
+def _decode(raw: str) -> UserProfileResponse:
+    return UserProfileResponse(**dict(zip(_FIELDS, json.loads(raw))))
+
+
+class _LocalCache:
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+
+_local = _LocalCache(settings.PROFILE_LOCAL_CACHE_SIZE, settings.PROFILE_LOCAL_CACHE_TTL_SECONDS)
+
+
+def _store_local(profile: UserProfileResponse):
+    _local.set(_id_key(profile.id), profile)
+    if profile.username:
+        _local.set(_username_key(profile.username), profile.id)
+
+
+def get_many(user_ids: list[int]) -> dict[int, UserProfileResponse]:
+    profiles = {}
+    remote_ids = []
+    for uid in user_ids:
+        profile = _local.get(_id_key(uid))
+        if profile is not None:
+            profiles[uid] = profile
+        else:
+            remote_ids.append(uid)
+    PROFILE_CACHE_REQUESTS.labels("local", "hit").inc(len(profiles))
+    PROFILE_CACHE_REQUESTS.labels("local", "miss").inc(len(remote_ids))
+
+    if not remote_ids:
+        return profiles
+
+    try:
+        values = redis_client.mget([_id_key(uid) for uid in remote_ids])
+    except Exception as e:
+        logger.warning(f"Profile cache read failed: {e}")
+        return profiles
+
+    hits = 0
+    for uid, raw in zip(remote_ids, values):
+        if raw is not None:
+            profile = _decode(raw)
+            _store_local(profile)
+            profiles[uid] = profile
+            hits += 1
+    PROFILE_CACHE_REQUESTS.labels("redis", "hit").inc(hits)
+    PROFILE_CACHE_REQUESTS.labels("redis", "miss").inc(len(remote_ids) - hits)
+    return profiles
+
+
+def get(user_id: int) -> Optional[UserProfileResponse]:
+    return get_many([user_id]).get(user_id)
+
+
+def get_by_username(username: str) -> Optional[UserProfileResponse]:
+    user_id = _local.get(_username_key(username))
+    if user_id is None:
+        try:
+            user_id = redis_client.get(_username_key(username))
+        except Exception as e:
+            logger.warning(f"Profile cache read failed: {e}")
+            return None
+        if user_id is None:
+            PROFILE_CACHE_REQUESTS.labels("redis", "miss").inc()
+            return None
+
+    profile = get(int(user_id))
+    # The username may have changed since the mapping was cached
+    if profile is None or profile.username != username:
+        return None
+    return profile
+
+
+def set_many(profiles: Iterable[UserProfileResponse]):
+    profiles = list(profiles)
+    for profile in profiles:
+        _store_local(profile)
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for profile in profiles:
+            pipe.set(_id_key(profile.id), _encode(profile), ex=settings.PROFILE_CACHE_TTL_SECONDS)
+            if profile.username:
+                pipe.set(_username_key(profile.username), profile.id, ex=settings.PROFILE_CACHE_TTL_SECONDS)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Profile cache write failed: {e}")
+
+
+def put(profile: UserProfileResponse):
+    set_many([profile])
+
+
+def invalidate(user_id: int, *usernames: Optional[str]):
+    keys = [_id_key(user_id)] + [_username_key(u) for u in usernames if u]
+    _local.delete(*keys)
+    try:
+        redis_client.delete(*keys)
+    except Exception as e:
+        logger.warning(f"Profile cache invalidation failed for user {user_id}: {e}")
@@ -1,4 +1,34 @@
+import hashlib
+from datetime import timedelta
 from redis import Redis
 from app.config.config import settings
 
 redis_client = Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, decode_responses=True)
+
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def session_key(token: str) -> str:
+    # One key per issued token, so every device keeps its own session. The
+    # gateway checks the same key, so keep the format in sync with it.
+    return f"session:{hash_token(token)}"
+
+
+def store_session(token: str, ttl: timedelta):
+    redis_client.setex(session_key(token), ttl, "1")
+
+
+def is_session_active(token: str) -> bool:
+    return bool(redis_client.exists(session_key(token)))
+
+
+def revoke_session(token: str):
+    redis_client.delete(session_key(token))
+    publish_token_revoked(token)
+
+
+def publish_token_revoked(token: str):
+    # Subscribers key their verification caches by the SHA-256 of the token
+    redis_client.publish(settings.TOKEN_REVOCATION_CHANNEL, hash_token(token))
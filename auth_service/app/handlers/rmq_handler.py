@@ -1,19 +0,0 @@
-import pika
-from app.config.config import settings
-
-def publish_to_rabbitmq(queue_name: str, message: str):
-    credentials = pika.PlainCredentials(settings.RABBITMQ_USER, settings.RABBITMQ_PASSWORD)
-    connection = pika.BlockingConnection(pika.ConnectionParameters(
-        host=settings.RABBITMQ_HOST,
-        port=settings.RABBITMQ_PORT,
-        credentials=credentials
-    ))
-    channel = connection.channel()
-    channel.queue_declare(queue=queue_name, durable=True)
-    channel.basic_publish(
-        exchange="",
-        routing_key=queue_name,
-        body=message,
-        properties=pika.BasicProperties(delivery_mode=2)  # make message persistent
-    )
-    connection.close()
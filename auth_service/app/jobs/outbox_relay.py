@@ -0,0 +1,38 @@
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from app.config.config import settings
+from app.db.session import SessionLocal
+from app.models.outbox_event import OutboxEvent
+from app.utils import event_bus
+from app.utils.outbox import to_event
+
+
+def relay_batch(db: Session) -> int:
+    """Publish the oldest committed outbox events and delete them; returns how many were relayed.
+
+    SKIP LOCKED lets every worker process relay concurrently without publishing
+    the same rows. A crash between publish and commit republishes the batch,
+    which consumers drop by event id.
+    """
+    rows = db.scalars(
+        select(OutboxEvent)
+        .order_by(OutboxEvent.id)
+        .limit(settings.OUTBOX_RELAY_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not rows:
+        db.rollback()
+        return 0
+
+    event_bus.publisher.publish_batch([to_event(row) for row in rows])
+    db.execute(delete(OutboxEvent).where(OutboxEvent.id.in_([row.id for row in rows])))
+    db.commit()
+    return len(rows)
+
+
+def run():
+    db = SessionLocal()
+    try:
+        return relay_batch(db)
+    finally:
+        db.close()
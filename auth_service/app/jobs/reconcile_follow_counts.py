@@ -0,0 +1,69 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.config.config import settings
+from app.db.session import SessionLocal
+from app.handlers.redis_handler import redis_client
+
+# Arbitrary key for pg_try_advisory_xact_lock, shared by every auth worker
+RECONCILE_LOCK_ID = 7_400_001
+RECONCILE_CLAIM_KEY = "jobs:reconcile-follow-counts:claimed"
+
+RECONCILE_FOLLOWERS_SQL = text("""
+    UPDATE users u SET followers_count = c.cnt
+    FROM (
+        SELECT u2.id, COUNT(f.id) AS cnt
+        FROM users u2 LEFT JOIN followers f ON f.followed_id = u2.id
+        GROUP BY u2.id
+    ) c
+    WHERE u.id = c.id AND u.followers_count <> c.cnt
+""")
+
+RECONCILE_FOLLOWING_SQL = text("""
+    UPDATE users u SET following_count = c.cnt
+    FROM (
+        SELECT u2.id, COUNT(f.id) AS cnt
+        FROM users u2 LEFT JOIN followers f ON f.follower_id = u2.id
+        GROUP BY u2.id
+    ) c
+    WHERE u.id = c.id AND u.following_count <> c.cnt
+""")
+
+
+def reconcile_follow_counts(db: Session) -> int:
+    """Repair drifted follow counters; returns the number of corrected rows."""
+    repaired = db.execute(RECONCILE_FOLLOWERS_SQL).rowcount
+    repaired += db.execute(RECONCILE_FOLLOWING_SQL).rowcount
+    db.commit()
+    return repaired
+
+
+def run() -> int:
+    """Reconcile once per interval across all workers.
+
+    The Redis claim lets a single worker run per interval; the advisory lock
+    keeps a second run from overlapping if the claim expires mid-run.
+    """
+    interval = max(settings.FOLLOW_COUNTS_RECONCILE_INTERVAL_SECONDS, 1)
+    if not redis_client.set(RECONCILE_CLAIM_KEY, "1", nx=True, ex=interval):
+        return 0
+
+    db = SessionLocal()
+    try:
+        locked = db.execute(
+            text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": RECONCILE_LOCK_ID}
+        ).scalar()
+        if not locked:
+            db.rollback()
+            return 0
+        # The transaction-scoped lock is released by the commit
+        return reconcile_follow_counts(db)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        print(f"Repaired {reconcile_follow_counts(db)} follow counter(s)")
+    finally:
+        db.close()
@@ -1,10 +1,18 @@
 from fastapi import FastAPI
 from app.controllers import auth_controller
 from app.db.base import Base
-from app.db.session import engine
+from app.db.session import engine, async_engine
+from app.db.migrations import apply_schema_updates
+from app.jobs import reconcile_follow_counts, outbox_relay
+from app.utils import event_bus
+from app.config.config import settings
+import asyncio
+import logging
 import os
+import random
 import uvicorn
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import make_asgi_app
 from tenacity import retry, wait_fixed, stop_after_attempt
 
 app = FastAPI(
@@ -30,16 +38,68 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+logger = logging.getLogger(__name__)
+
 @retry(wait=wait_fixed(2), stop=stop_after_attempt(5))
 def create_tables():
     Base.metadata.create_all(bind=engine)
+    apply_schema_updates(engine)
 
 @app.on_event("startup")
 def startup():
     create_tables()
 
+async def reconcile_follow_counts_periodically():
+    interval = settings.FOLLOW_COUNTS_RECONCILE_INTERVAL_SECONDS
+    # Don't add a full-table UPDATE to startup; jitter spreads workers out
+    await asyncio.sleep(interval + random.uniform(0, min(interval, 60)))
+    while True:
+        try:
+            repaired = await asyncio.to_thread(reconcile_follow_counts.run)
+            if repaired:
+                logger.warning(f"Repaired {repaired} drifted follow counter(s)")
+        except Exception as e:
+            logger.error(f"Follow counter reconciliation failed: {e}")
+        await asyncio.sleep(interval)
+
+async def relay_outbox_periodically():
+    while True:
+        try:
+            relayed = await asyncio.to_thread(outbox_relay.run)
+        except Exception as e:
+            logger.error(f"Outbox relay failed: {e}")
+            relayed = 0
+        # Keep draining while batches come back full
+        if relayed < settings.OUTBOX_RELAY_BATCH_SIZE:
+            await asyncio.sleep(settings.OUTBOX_RELAY_INTERVAL_SECONDS)
+
+@app.on_event("startup")
+async def start_background_jobs():
+    if event_bus.publisher:
+        event_bus.publisher.start()
+        app.state.outbox_relay_task = asyncio.create_task(relay_outbox_periodically())
+    if settings.FOLLOW_COUNTS_RECONCILE_INTERVAL_SECONDS > 0:
+        app.state.reconcile_task = asyncio.create_task(reconcile_follow_counts_periodically())
+
+@app.on_event("shutdown")
+async def shutdown():
+    reconcile_task = getattr(app.state, "reconcile_task", None)
+    if reconcile_task:
+        reconcile_task.cancel()
+        try:
+            await reconcile_task
+        except asyncio.CancelledError:
+            pass
+    if event_bus.publisher:
+        app.state.outbox_relay_task.cancel()
+        await asyncio.to_thread(event_bus.publisher.stop)
+    await async_engine.dispose()
+
 app.include_router(auth_controller.router, prefix="/auth", tags=["Authentication"])
 
+# Prometheus metrics
+app.mount("/metrics", make_asgi_app())
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8010))
     uvicorn.run("app.main:app", host="0.0.0.0", port=port, reload=True)
@@ -0,0 +1,14 @@
+from datetime import datetime
+from sqlalchemy import BigInteger, Column, DateTime, String, Text
+from app.db.base import Base
+
+
+class OutboxEvent(Base):
+    """Domain event written in the same transaction as the change it describes."""
+    __tablename__ = "outbox_events"
+
+    id = Column(BigInteger, primary_key=True)
+    event_id = Column(String(32), nullable=False, unique=True)  # idempotency key on the bus
+    event_type = Column(String(64), nullable=False)
+    payload = Column(Text, nullable=False)  # encoded JSON, relayed as is
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
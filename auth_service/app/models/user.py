@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, UniqueConstraint, Index
 from datetime import datetime
 from app.db.base import Base
 from app.enums.role_enum import Role
@@ -27,6 +27,10 @@ class User(Base):
 
     role = Column(Enum(Role), default=Role.USER)
 
+    # Denormalized follow counters, maintained by follow_user/unfollow_user
+    followers_count = Column(Integer, nullable=False, default=0, server_default="0")
+    following_count = Column(Integer, nullable=False, default=0, server_default="0")
+
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -45,3 +49,13 @@ class Follower(Base):
 
     follower = relationship("User", foreign_keys=[follower_id], back_populates="following")
     followed = relationship("User", foreign_keys=[followed_id], back_populates="followers")
+
+    __table_args__ = (
+        # Doubles as the index for "who does X follow" lookups
+        UniqueConstraint("follower_id", "followed_id", name="uq_followers_follower_followed"),
+        # Reverse index for "who follows X" lookups
+        Index("ix_followers_followed_follower", "followed_id", "follower_id"),
+        # Newest-first timelines of follow activity
+        Index("ix_followers_follower_created_at", "follower_id", created_at.desc()),
+        Index("ix_followers_followed_created_at", "followed_id", created_at.desc()),
+    )
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
 from app.enums.role_enum import Role
 
@@ -31,9 +31,15 @@ class UserProfileUpdateRequest(BaseModel):
     
 class FollowersListResponse(BaseModel):
     followers: List[UserProfileResponse]
+    next_cursor: Optional[int] = None
 
 class FollowingListResponse(BaseModel):
     following: List[UserProfileResponse]
+    next_cursor: Optional[int] = None
+
+
+class UserBatchRequest(BaseModel):
+    ids: List[int] = Field(..., max_length=100, example=[1, 2, 3])
 
 
 class UsernameCheckResponse(BaseModel):
@@ -1,39 +1,46 @@
 from datetime import timedelta
-from typing import List
+from typing import List, Optional
 from app.schemas.follow_schema import FollowCountsResponse
 from fastapi import HTTPException, status
 from httpx import AsyncClient
+import asyncio
 import random
 from app.assets.profile_pictures import pictures
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.user import User, Follower
 from app.models.temp_user import TempUser
 from app.utils.password_hasher import hash_password, verify_password
 from app.handlers.jwt_handler import create_access_token, decode_access_token
-from app.handlers.redis_handler import redis_client
+from app.handlers.redis_handler import redis_client, is_session_active, revoke_session
+from app.handlers import profile_cache
+from app.utils import event_bus, outbox
 from app.config.config import settings
 from app.enums.role_enum import Role
 from app.schemas.user_schema import UserProfileUpdateRequest, FollowersListResponse, FollowingListResponse, UserProfileResponse
 from app.schemas.profile_picture_schema import CreatePostRequest, CreatePostResponse
 
 
-def signup_user(db: Session, name: str, email: str, password: str):
-    if db.query(TempUser).filter_by(email=email).first():
+async def signup_user(db: AsyncSession, name: str, email: str, password: str):
+    if await db.scalar(select(TempUser.id).filter_by(email=email)):
         raise HTTPException(status_code=400, detail="User already signed up. Please log in.")
 
-    temp_user = TempUser(name=name, email=email, password=hash_password(password))
+    temp_user = TempUser(name=name, email=email, password=await hash_password(password))
     db.add(temp_user)
-    db.commit()
+    await db.commit()
     return {"message": "Signup successful. Please login to activate your account."}
 
 
-def login_user(db: Session, email: str, password: str):
-    user = db.query(User).filter_by(email=email).first()
-    if user and verify_password(password, user.password):
-        return _issue_or_reuse_token(user, force_new=True)
+async def login_user(db: AsyncSession, email: str, password: str):
+    user = await db.scalar(select(User).filter_by(email=email))
+    if user and await verify_password(password, user.password):
+        return await asyncio.to_thread(_issue_or_reuse_token, user, True)
 
-    temp_user = db.query(TempUser).filter_by(email=email).first()
-    if temp_user and verify_password(password, temp_user.password):
+    temp_user = await db.scalar(select(TempUser).filter_by(email=email))
+    if temp_user and await verify_password(password, temp_user.password):
         user = User(
             name=temp_user.name,
             email=temp_user.email,
@@ -41,10 +48,11 @@ def login_user(db: Session, email: str, password: str):
             role=Role.USER
         )
         db.add(user)
-        db.delete(temp_user)
-        db.commit()
-        db.refresh(user)
-        return _issue_or_reuse_token(user, force_new=True)
+        await db.delete(temp_user)
+        await db.flush()
+        outbox.add_event(db, event_bus.USER_CREATED, {"user_id": user.id, "email": user.email, "name": user.name})
+        await db.commit()
+        return await asyncio.to_thread(_issue_or_reuse_token, user, True)
 
     raise HTTPException(status_code=401, detail="Invalid credentials")
 
@@ -76,12 +84,13 @@ def logout_user(token: str):
 
     email = payload["sub"]
     redis_key = f"user:{email}"
-    existing_token = redis_client.get(redis_key)
-
-    if not existing_token or existing_token != token:
+    if not is_session_active(token):
         raise HTTPException(status_code=401, detail="You're already logged out. Login again to logout 😜")
 
-    redis_client.delete(redis_key)
+    # Other devices keep their own sessions
+    if redis_client.get(redis_key) == token:
+        redis_client.delete(redis_key)
+    revoke_session(token)
     return {"message": "Logged out successfully"}
 
 
@@ -91,6 +100,10 @@ def verify_token(token: str, db: Session):
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+    # A token is revoked once its session key is gone (logout or expiry)
+    if not is_session_active(token):
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+
     user = db.query(User).filter_by(id=payload.get("user_id")).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -98,27 +111,34 @@ def verify_token(token: str, db: Session):
     return {"message": "Token is valid", "user_id": user.id, "email": user.email, "role": user.role.name}
 
 
-def get_my_profile(token: str, db: Session) -> User:
+def _get_cached_profile(db: Session, user_id: int) -> UserProfileResponse:
+    profile = profile_cache.get(user_id)
+    if profile is None:
+        user = db.query(User).filter_by(id=user_id).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        profile = UserProfileResponse.model_validate(user)
+        profile_cache.put(profile)
+    return profile
+
+def get_my_profile(token: str, db: Session) -> UserProfileResponse:
     payload = decode_access_token(token)
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = db.query(User).filter_by(id=payload["user_id"]).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    return user
+    return _get_cached_profile(db, payload["user_id"])
 
-def get_user_profile(user_id, token: str, db: Session) -> User:
+def get_user_profile(user_id, token: str, db: Session) -> UserProfileResponse:
     payload = decode_access_token(token)
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = db.query(User).filter_by(id=user_id).first()
-    if not user:
+    try:
+        user_id = int(user_id)
+    except ValueError:
         raise HTTPException(status_code=404, detail="User not found")
 
-    return user
+    return _get_cached_profile(db, user_id)
 
 def create_user_profile(token: str, db: Session, payload: UserProfileUpdateRequest):
     creds = decode_access_token(token)
@@ -128,6 +148,7 @@ def create_user_profile(token: str, db: Session, payload: UserProfileUpdateReque
     user = db.query(User).filter_by(id=creds["user_id"]).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    previous_username = user.username
    
     # Update user profile fields
     user.name = payload.name 
@@ -139,8 +160,12 @@ def create_user_profile(token: str, db: Session, payload: UserProfileUpdateReque
     user.profile_pic = random.choice(pictures)
     user.gender = payload.gender
 
+    outbox.add_event(db, event_bus.USER_UPDATED, {
+        "user_id": user.id, "username": user.username, "previous_username": previous_username
+    })
     db.commit()
     db.refresh(user)
+    profile_cache.invalidate(user.id, previous_username, user.username)
 
     return user
 
@@ -152,6 +177,7 @@ def update_user_profile(token: str, db: Session, payload: UserProfileUpdateReque
     user = db.query(User).filter_by(id=creds["user_id"]).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    previous_username = user.username
    
     # Update user profile fields
     user.name = payload.name 
@@ -164,11 +190,30 @@ def update_user_profile(token: str, db: Session, payload: UserProfileUpdateReque
     # user.profile_pic = random.choice(pictures)
     
 
+    outbox.add_event(db, event_bus.USER_UPDATED, {
+        "user_id": user.id, "username": user.username, "previous_username": previous_username
+    })
     db.commit()
     db.refresh(user)
+    profile_cache.invalidate(user.id, previous_username, user.username)
 
     return user
 
+def _adjust_follow_counts(db: Session, follower_id: int, followed_id: int, delta: int) -> Optional[str]:
+    # Relative UPDATEs in the caller's transaction, so concurrent follows don't lose increments
+    followed_username = db.execute(
+        update(User)
+        .where(User.id == followed_id)
+        .values(followers_count=User.followers_count + delta)
+        .returning(User.username)
+    ).scalar()
+    db.execute(
+        update(User)
+        .where(User.id == follower_id)
+        .values(following_count=User.following_count + delta)
+    )
+    return followed_username
+
 def follow_user(db: Session, token: str, followed_id: int):
     user_id = decode_access_token(token).get("user_id")
     if not user_id:
@@ -177,70 +222,102 @@ def follow_user(db: Session, token: str, followed_id: int):
     if user_id == followed_id:
         raise HTTPException(status_code=400, detail="You cannot follow yourself")
 
-    followed_user = db.query(User).filter(User.id == followed_id).first()
-    if not followed_user:
+    # The unique (follower_id, followed_id) key replaces the separate duplicate check
+    stmt = (
+        pg_insert(Follower)
+        .values(follower_id=user_id, followed_id=followed_id)
+        .on_conflict_do_nothing(index_elements=[Follower.follower_id, Follower.followed_id])
+        .returning(Follower.id)
+    )
+    try:
+        inserted = db.execute(stmt).first()
+    except IntegrityError:
+        # Foreign key violation: the followed user does not exist
+        db.rollback()
         raise HTTPException(status_code=404, detail="User to follow not found")
 
-    existing_follow = db.query(Follower).filter(Follower.follower_id == user_id, Follower.followed_id == followed_id).first()
-    if existing_follow:
+    if not inserted:
+        db.rollback()
         raise HTTPException(status_code=400, detail="You are already following this user")
 
-    follow = Follower(follower_id=user_id, followed_id=followed_id)
-    db.add(follow)
+    followed_username = _adjust_follow_counts(db, user_id, followed_id, 1)
+    outbox.add_event(db, event_bus.FOLLOW_CREATED, {"follower_id": user_id, "followed_id": followed_id})
     db.commit()
-    return {"message": f"You are now following {followed_user.username}"}
+    return {"message": f"You are now following {followed_username}"}
 
 def unfollow_user(db: Session, token: str, followed_id: int):
     user_id = decode_access_token(token).get("user_id")
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    follow = db.query(Follower).filter(Follower.follower_id == user_id, Follower.followed_id == followed_id).first()
-    if not follow:
+    deleted = db.execute(
+        delete(Follower)
+        .where(Follower.follower_id == user_id, Follower.followed_id == followed_id)
+        .returning(Follower.id)
+    ).first()
+    if not deleted:
+        db.rollback()
         raise HTTPException(status_code=404, detail="You are not following this user")
 
-    db.delete(follow)
+    _adjust_follow_counts(db, user_id, followed_id, -1)
+    outbox.add_event(db, event_bus.FOLLOW_DELETED, {"follower_id": user_id, "followed_id": followed_id})
     db.commit()
     return {"message": f"You have unfollowed user"}
 
-def get_followers(db: Session, token: str, user_id: int):
-     user = db.query(User).filter(User.id == user_id).first()
-     if not user:
-          raise HTTPException(status_code=404, detail="User not found")
-     
-     followers = user.followers
-     follower_list = []
-
-     for follower in followers:
-          user = db.query(User).filter(User.id == follower.follower_id).first()
-          follower_list.append(UserProfileResponse(id=user.id, name=user.name or "", username=user.username or "", email=user.email or "", bio=user.bio or "", profile_pic=user.profile_pic or "", website=user.website or "", gender=user.gender or "", location=user.location or ""))
-     
-     return FollowersListResponse(followers=follower_list)
-
-def get_following(db: Session, token: str, user_id: int):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+def _profile_response(user: User) -> UserProfileResponse:
+    return UserProfileResponse(
+        id=user.id,
+        name=user.name or "",
+        username=user.username or "",
+        email=user.email or "",
+        bio=user.bio or "",
+        profile_pic=user.profile_pic or "",
+        website=user.website or "",
+        gender=user.gender or "",
+        location=user.location or ""
+    )
+
+
+async def _ensure_user_exists(db: AsyncSession, user_id: int):
+    if not await db.scalar(select(User.id).where(User.id == user_id)):
         raise HTTPException(status_code=404, detail="User not found")
-    
-    following = user.following
-    following_list = []
 
-    for followed in following:
-        user = db.query(User).filter(User.id == followed.followed_id).first()
-        following_list.append(UserProfileResponse(id=user.id, name=user.name, username=user.username, email=user.email, bio=user.bio, profile_pic=user.profile_pic, website=user.website, gender=user.gender, location=user.location))
-    
-    return FollowingListResponse(following=following_list)
 
+async def get_followers(db: AsyncSession, token: str, user_id: int, after_id: Optional[int] = None, limit: int = 50):
+    # Keyset pagination on the follower's user id, served by the (followed_id, follower_id) index
+    query = select(User).join(Follower, Follower.follower_id == User.id).where(Follower.followed_id == user_id)
+    if after_id is not None:
+        query = query.where(Follower.follower_id > after_id)
+    users = (await db.scalars(query.order_by(Follower.follower_id).limit(limit))).all()
 
-def get_follow_counts(db: Session, token: str, user_id: int):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    if not users and after_id is None:
+        await _ensure_user_exists(db, user_id)
+
+    next_cursor = users[-1].id if len(users) == limit else None
+    return FollowersListResponse(followers=[_profile_response(u) for u in users], next_cursor=next_cursor)
+
+async def get_following(db: AsyncSession, token: str, user_id: int, after_id: Optional[int] = None, limit: int = 50):
+    # Keyset pagination on the followed user's id, served by the (follower_id, followed_id) index
+    query = select(User).join(Follower, Follower.followed_id == User.id).where(Follower.follower_id == user_id)
+    if after_id is not None:
+        query = query.where(Follower.followed_id > after_id)
+    users = (await db.scalars(query.order_by(Follower.followed_id).limit(limit))).all()
 
-    followers_count = db.query(Follower).filter(Follower.followed_id == user_id).count()
-    following_count = db.query(Follower).filter(Follower.follower_id == user_id).count()
+    if not users and after_id is None:
+        await _ensure_user_exists(db, user_id)
 
-    return FollowCountsResponse(followers_count=followers_count, following_count=following_count)
+    next_cursor = users[-1].id if len(users) == limit else None
+    return FollowingListResponse(following=[_profile_response(u) for u in users], next_cursor=next_cursor)
+
+
+async def get_follow_counts(db: AsyncSession, token: str, user_id: int):
+    counts = (await db.execute(
+        select(User.followers_count, User.following_count).where(User.id == user_id)
+    )).first()
+    if not counts:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    return FollowCountsResponse(followers_count=counts.followers_count, following_count=counts.following_count)
 
 async def create_user_profile_picture():
     ... 
@@ -249,12 +326,28 @@ async def update_user_profile_picture():
     ...
 
 
-def check_username_exists(db: Session, username: str):
-    user = db.query(User).filter_by(username=username).first()
-    if user:
+def get_user_profiles_batch(db: Session, token: str, user_ids: List[int]) -> List[UserProfileResponse]:
+    if not decode_access_token(token):
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    user_ids = list(dict.fromkeys(user_ids))
+    profiles = profile_cache.get_many(user_ids)
+
+    missing = [uid for uid in user_ids if uid not in profiles]
+    if missing:
+        loaded = [UserProfileResponse.model_validate(u) for u in db.query(User).filter(User.id.in_(missing)).all()]
+        profile_cache.set_many(loaded)
+        profiles.update({p.id: p for p in loaded})
+
+    return [profiles[uid] for uid in user_ids if uid in profiles]
+
+
+async def check_username_exists(db: AsyncSession, username: str):
+    user_id = await db.scalar(select(User.id).filter_by(username=username))
+    if user_id:
         return {
             "exists": True,
-            "user_id": user.id,
+            "user_id": user_id,
             "message": "Username exists"
         }
     raise HTTPException(
@@ -268,25 +361,28 @@ def check_username_exists(db: Session, username: str):
 
 
 def get_user_by_username(db: Session, username: str) -> UserProfileResponse:
-    user = db.query(User).filter_by(username=username).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    profile = profile_cache.get_by_username(username)
+    if profile is None:
+        user = db.query(User).filter_by(username=username).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        profile = UserProfileResponse.model_validate(user)
+        profile_cache.put(profile)
 
     return UserProfileResponse(
-        id=user.id,
-        name=user.name or "",
-        username=user.username or "",
-        email=user.email or "",
-        bio=user.bio or "",
-        profile_pic=user.profile_pic or "",
-        website=user.website or "",
-        gender=user.gender or "",
-        location=user.location or ""
+        id=profile.id,
+        name=profile.name or "",
+        username=profile.username or "",
+        email=profile.email or "",
+        bio=profile.bio or "",
+        profile_pic=profile.profile_pic or "",
+        website=profile.website or "",
+        gender=profile.gender or ""
     )
 
 
-def get_all_user_profiles(db: Session, skip: int = 0, limit: int = 10) -> List[UserProfileResponse]:
-    users = db.query(User).offset(skip).limit(limit).all()
+async def get_all_user_profiles(db: AsyncSession, skip: int = 0, limit: int = 10) -> List[UserProfileResponse]:
+    users = (await db.scalars(select(User).offset(skip).limit(limit))).all()
     return [
         UserProfileResponse(
             id=user.id,
@@ -0,0 +1,289 @@
+import asyncio
+import json
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import AsyncIterator, Awaitable, Callable, Optional
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from redis.exceptions import ResponseError
+from app.config.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Domain events on Redis Streams, one stream per event type ("events:<type>").
+# Delivery is at-least-once: every event carries a unique id, which consumers
+# use as an idempotency key to skip redeliveries of events already handled.
+USER_CREATED = "user.created"
+USER_UPDATED = "user.updated"
+FOLLOW_CREATED = "follow.created"
+FOLLOW_DELETED = "follow.deleted"
+FRIENDSHIP_ACCEPTED = "friendship.accepted"
+POST_CREATED = "post.created"
+
+Handler = Callable[[dict], Awaitable[None]]
+
+
+def stream_name(event_type: str) -> str:
+    return f"events:{event_type}"
+
+
+def encode_payload(payload: dict) -> str:
+    return json.dumps(payload, separators=(",", ":"), default=str)
+
+
+def make_event(event_type: str, payload: dict, event_id: Optional[str] = None) -> dict:
+    return {
+        "id": event_id or uuid.uuid4().hex,
+        "type": event_type,
+        "occurred_at": datetime.now(timezone.utc).isoformat(),
+        "payload": encode_payload(payload),
+    }
+
+
+def decode_event(fields: dict) -> dict:
+    return {**fields, "payload": json.loads(fields["payload"])}
+
+
+class EventPublisher:
+    """Buffers events in memory and writes them in pipelined XADD batches from one thread.
+
+    publish() never blocks or raises, so it is safe on the request path of both
+    sync and async handlers.
+    """
+
+    def __init__(self, redis_url: str):
+        self._redis = Redis.from_url(redis_url, decode_responses=True)
+        self._queue = queue.Queue(maxsize=settings.EVENT_PUBLISH_QUEUE_SIZE)
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def publish(self, event_type: str, payload: dict, event_id: Optional[str] = None) -> str:
+        event = make_event(event_type, payload, event_id)
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            logger.error(f"Event queue full, dropping {event_type} {event['id']}")
+        return event["id"]
+
+    def publish_batch(self, events: list[dict]):
+        """Writes already-built events in one round trip; raises if Redis is unavailable."""
+        pipe = self._redis.pipeline(transaction=False)
+        for event in events:
+            pipe.xadd(stream_name(event["type"]), event, maxlen=settings.EVENT_STREAM_MAXLEN, approximate=True)
+        pipe.execute()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="event-publisher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _next_batch(self) -> list[dict]:
+        try:
+            batch = [self._queue.get(timeout=settings.EVENT_PUBLISH_FLUSH_INTERVAL)]
+        except queue.Empty:
+            return []
+        # Whatever queued up while the last batch was in flight goes out together
+        while len(batch) < settings.EVENT_PUBLISH_BATCH_SIZE:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        batch = []
+        backoff = 0.1
+        while batch or not (self._stopping.is_set() and self._queue.empty()):
+            if not batch:
+                batch = self._next_batch()
+                continue
+            try:
+                self.publish_batch(batch)
+                batch = []
+                backoff = 0.1
+            except Exception as e:
+                if self._stopping.is_set():
+                    logger.error(f"Dropping {len(batch) + self._queue.qsize()} unpublished event(s) on shutdown: {e}")
+                    return
+                logger.warning(f"Event publish failed for {len(batch)} event(s), retrying: {e}")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 5.0)
+
+
+class EventConsumer:
+    """Reads event streams through a consumer group and acknowledges after each handler succeeds.
+
+    Failed events stay pending and are retried once they have been idle for
+    EVENT_CLAIM_IDLE_MS, as are events left behind by a consumer that died. An
+    event that has failed EVENT_MAX_DELIVERIES times is moved to "<stream>:dead"
+    and acknowledged, so one poison event cannot be retried forever.
+    """
+
+    def __init__(self, redis_url: str, group: str, handlers: dict[str, Handler], start_id: str = "$"):
+        self._redis = AsyncRedis.from_url(redis_url, decode_responses=True)
+        self.group = group
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self.start_id = start_id  # where a new group starts: "$" for new events only, "0" to replay the stream
+        self._handlers = {stream_name(t): handler for t, handler in handlers.items()}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._redis.aclose()
+
+    async def _ensure_groups(self):
+        for stream in self._handlers:
+            try:
+                await self._redis.xgroup_create(stream, self.group, id=self.start_id, mkstream=True)
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    def _done_key(self, event_id: str) -> str:
+        return f"events:done:{self.group}:{event_id}"
+
+    async def _handle(self, stream: str, entries: list):
+        # Trimmed entries come back without fields; there is nothing left to process
+        live = [(message_id, fields) for message_id, fields in entries if fields]
+        acked = [message_id for message_id, fields in entries if not fields]
+
+        # Redelivered events that were already handled are only acknowledged
+        done = await self._redis.mget([self._done_key(fields["id"]) for _, fields in live]) if live else []
+        handled = []
+        for (message_id, fields), already_done in zip(live, done):
+            if already_done:
+                acked.append(message_id)
+                continue
+            try:
+                await self._handlers[stream](decode_event(fields))
+            except Exception as e:
+                if await self._dead_letter(stream, message_id, fields, e):
+                    acked.append(message_id)
+                continue
+            acked.append(message_id)
+            handled.append(fields["id"])
+
+        if acked:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for event_id in handled:
+                    pipe.set(self._done_key(event_id), 1, ex=settings.EVENT_DEDUPE_TTL_SECONDS)
+                pipe.xack(stream, self.group, *acked)
+                await pipe.execute()
+
+    async def _dead_letter(self, stream: str, message_id: str, fields: dict, error: Exception) -> bool:
+        """Moves an event to the dead-letter stream once it is out of retries; True if moved."""
+        pending = await self._redis.xpending_range(stream, self.group, min=message_id, max=message_id, count=1)
+        deliveries = pending[0]["times_delivered"] if pending else 0
+        if deliveries < settings.EVENT_MAX_DELIVERIES:
+            logger.error(f"{self.group}: handler for {stream} failed on {message_id} (delivery {deliveries}), leaving it pending: {error}")
+            return False
+
+        await self._redis.xadd(
+            f"{stream}:dead",
+            {**fields, "source_id": message_id, "group": self.group, "error": str(error)},
+            maxlen=settings.EVENT_STREAM_MAXLEN, approximate=True
+        )
+        logger.error(f"{self.group}: {message_id} on {stream} failed {deliveries} times, moved to {stream}:dead: {error}")
+        return True
+
+    async def _drain_own_pending(self):
+        # Entries delivered to this consumer name before a restart and never acknowledged
+        for stream in self._handlers:
+            last_id = "0"
+            while True:
+                response = await self._redis.xreadgroup(
+                    self.group, self.consumer, {stream: last_id}, count=settings.EVENT_CONSUMER_BATCH_SIZE
+                )
+                entries = response[0][1] if response else []
+                if not entries:
+                    break
+                await self._handle(stream, entries)
+                last_id = entries[-1][0]
+
+    async def _claim_stale(self):
+        for stream in self._handlers:
+            result = await self._redis.xautoclaim(
+                stream, self.group, self.consumer, settings.EVENT_CLAIM_IDLE_MS,
+                start_id="0-0", count=settings.EVENT_CONSUMER_BATCH_SIZE
+            )
+            if result[1]:
+                await self._handle(stream, result[1])
+
+    async def _run(self):
+        while True:
+            try:
+                await self._ensure_groups()
+                await self._drain_own_pending()
+                break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"{self.group}: event consumer setup failed, retrying: {e}")
+                await asyncio.sleep(5)
+
+        last_claim = time.monotonic()
+        while True:
+            try:
+                if time.monotonic() - last_claim >= settings.EVENT_CLAIM_IDLE_MS / 1000:
+                    await self._claim_stale()
+                    last_claim = time.monotonic()
+                response = await self._redis.xreadgroup(
+                    self.group, self.consumer, {stream: ">" for stream in self._handlers},
+                    count=settings.EVENT_CONSUMER_BATCH_SIZE, block=settings.EVENT_CONSUMER_BLOCK_MS
+                )
+                for stream, entries in response or []:
+                    await self._handle(stream, entries)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"{self.group}: event consumer failed, retrying: {e}")
+                await asyncio.sleep(1)
+
+
+async def replay(redis_url: str, event_type: str, since: str = "-", page_size: int = 500) -> AsyncIterator[dict]:
+    """Yields retained events of one type in order, e.g. to rebuild a cache from scratch."""
+    client = AsyncRedis.from_url(redis_url, decode_responses=True)
+    try:
+        start = since
+        while True:
+            entries = await client.xrange(stream_name(event_type), min=start, max="+", count=page_size)
+            for message_id, fields in entries:
+                yield decode_event(fields)
+            if len(entries) < page_size:
+                return
+            start = f"({entries[-1][0]}"
+    finally:
+        await client.aclose()
+
+
+_redis_url = f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}"
+publisher = EventPublisher(_redis_url) if settings.EVENT_BUS_ENABLED else None
+
+
+def publish(event_type: str, payload: dict, event_id: Optional[str] = None) -> Optional[str]:
+    if publisher is None:
+        return None
+    return publisher.publish(event_type, payload, event_id)
@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, Security
-from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.schemas.friendship_schema import FriendRequestCreate, FriendRequestUpdate, FriendResponse
-from app.services import friendship_service
+from typing import Union
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Security
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_db
+from app.schemas.friendship_schema import (
+    FriendRequestCreate, FriendRequestUpdate, FriendResponse, FriendIdsResponse,
+    AreFriendsResponse, MutualFriendsResponse, FriendSuggestionsResponse
+)
+from app.services import friendship_service, suggestion_service
 from app.utils.gateway_auth import verify_token
+from app.utils import event_bus
 
 router = APIRouter()
 
@@ -20,8 +25,8 @@ router = APIRouter()
         409: {"description": "Conflict - Friend request already exists"}
     }
 )
-async def send_request(payload: FriendRequestCreate, db: Session = Depends(get_db), user=Depends(verify_token)):
-    return friendship_service.send_friend_request(db, user["id"], payload.friend_id)
+async def send_request(payload: FriendRequestCreate, db: AsyncSession = Depends(get_async_db), user=Depends(verify_token)):
+    return await friendship_service.send_friend_request(db, user["id"], payload.friend_id)
 
 
 @router.get(
@@ -34,8 +39,8 @@ async def send_request(payload: FriendRequestCreate, db: Session = Depends(get_d
         401: {"description": "Unauthorized - Invalid or missing token"},
     }
 )
-async def sent_requests(db: Session = Depends(get_db), user=Depends(verify_token)):
-    return friendship_service.get_sent_requests(db, user["id"])
+async def sent_requests(db: AsyncSession = Depends(get_async_db), user=Depends(verify_token)):
+    return await friendship_service.get_sent_requests(db, user["id"])
 
 
 @router.get(
@@ -48,8 +53,8 @@ async def sent_requests(db: Session = Depends(get_db), user=Depends(verify_token
         401: {"description": "Unauthorized - Invalid or missing token"},
     }
 )
-async def received_requests(db: Session = Depends(get_db), user=Depends(verify_token)):
-    return friendship_service.get_received_requests(db, user["id"])
+async def received_requests(db: AsyncSession = Depends(get_async_db), user=Depends(verify_token)):
+    return await friendship_service.get_received_requests(db, user["id"])
 
 
 @router.put(
@@ -63,10 +68,18 @@ async def received_requests(db: Session = Depends(get_db), user=Depends(verify_t
         404: {"description": "Friend request not found or not allowed"}
     }
 )
-async def accept(payload: FriendRequestUpdate, db: Session = Depends(get_db), user=Depends(verify_token)):
-    updated = friendship_service.accept_request(db, user["id"], payload.request_id)
+async def accept(
+    payload: FriendRequestUpdate,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(verify_token)
+):
+    updated = await friendship_service.accept_request(db, user["id"], payload.request_id)
     if not updated:
         raise HTTPException(status_code=404, detail="Request not found or not allowed")
+    if event_bus.publisher is None:
+        # Without the event bus the suggestion update runs in-process instead of in the consumer
+        background_tasks.add_task(suggestion_service.on_friendship_accepted, updated.user_id, updated.friend_id)
     return updated
 
 
@@ -80,8 +93,8 @@ async def accept(payload: FriendRequestUpdate, db: Session = Depends(get_db), us
         401: {"description": "Unauthorized - Invalid or missing token"},
     }
 )
-async def friends_who_accepted_me(db: Session = Depends(get_db), user=Depends(verify_token)):
-    return friendship_service.get_friends_who_accepted_me(db, user["id"])
+async def friends_who_accepted_me(db: AsyncSession = Depends(get_async_db), user=Depends(verify_token)):
+    return await friendship_service.get_friends_who_accepted_me(db, user["id"])
 
 
 @router.get(
@@ -94,5 +107,73 @@ async def friends_who_accepted_me(db: Session = Depends(get_db), user=Depends(ve
         401: {"description": "Unauthorized - Invalid or missing token"},
     }
 )
-async def friends_i_accepted(db: Session = Depends(get_db), user=Depends(verify_token)):
-    return friendship_service.get_friends_i_accepted(db, user["id"])
+async def friends_i_accepted(db: AsyncSession = Depends(get_async_db), user=Depends(verify_token)):
+    return await friendship_service.get_friends_i_accepted(db, user["id"])
+
+
+@router.get(
+    "/friends",
+    response_model=Union[FriendIdsResponse, list[FriendResponse]],
+    summary="All friends of the current user",
+    description="Returns every accepted friendship of the current user, whichever side sent the request. "
+                "With ids_only=true only the friend user ids are returned, for service-to-service calls.",
+    responses={
+        200: {"description": "Accepted friendships, or the friend ids in ids_only mode"},
+        401: {"description": "Unauthorized - Invalid or missing token"},
+    }
+)
+async def friends(ids_only: bool = False, db: AsyncSession = Depends(get_async_db), user=Depends(verify_token)):
+    if ids_only:
+        return {"user_id": user["id"], "friend_ids": await friendship_service.get_friend_ids(db, user["id"])}
+    return await friendship_service.get_friends(db, user["id"])
+
+
+@router.get(
+    "/are-friends/{other_id}",
+    response_model=AreFriendsResponse,
+    summary="Check whether a user is a friend",
+    description="Returns whether the current user and the given user are friends. Intended for privacy checks.",
+    responses={
+        200: {"description": "Friendship status"},
+        401: {"description": "Unauthorized - Invalid or missing token"},
+    }
+)
+async def are_friends(other_id: int, db: AsyncSession = Depends(get_async_db), user=Depends(verify_token)):
+    return {
+        "user_id": user["id"],
+        "other_id": other_id,
+        "are_friends": await friendship_service.are_friends(db, user["id"], other_id)
+    }
+
+
+@router.get(
+    "/mutual/{other_id}",
+    response_model=MutualFriendsResponse,
+    summary="Mutual friends with a user",
+    description="Returns the ids of users who are friends with both the current user and the given user.",
+    responses={
+        200: {"description": "Mutual friend ids"},
+        401: {"description": "Unauthorized - Invalid or missing token"},
+    }
+)
+async def mutual_friends(other_id: int, db: AsyncSession = Depends(get_async_db), user=Depends(verify_token)):
+    mutual = await friendship_service.mutual_friends(db, user["id"], other_id)
+    return {"user_id": user["id"], "other_id": other_id, "mutual_friend_ids": mutual, "count": len(mutual)}
+
+
+@router.get(
+    "/suggestions",
+    response_model=FriendSuggestionsResponse,
+    summary="Friend suggestions",
+    description="Returns friends-of-friends ranked by the number of mutual friends with the current user.",
+    responses={
+        200: {"description": "Suggested users with their mutual friend counts"},
+        401: {"description": "Unauthorized - Invalid or missing token"},
+    }
+)
+async def suggestions(
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(verify_token)
+):
+    return {"user_id": user["id"], "suggestions": await suggestion_service.get_suggestions(db, user["id"], limit)}
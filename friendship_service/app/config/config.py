@@ -1,10 +1,57 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    ASYNC_DATABASE_URL: Optional[str] = None
     GATEWAY_URL: str
     AUTH_VERIFY_URL: str# Gateway URL like http://gateway:8000/auth/verify-token
 
+    # Token verification cache, invalidated through auth_service's revocation channel;
+    # disabled when REDIS_URL is unset
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    TOKEN_CACHE_TTL_SECONDS: float = 30.0
+    REDIS_URL: Optional[str] = None
+    TOKEN_REVOCATION_CHANNEL: str = "auth:token-revoked"
+
+    # Shared HMAC key for the gateway's signed x-user-* headers
+    GATEWAY_IDENTITY_SECRET: Optional[str] = None
+    GATEWAY_IDENTITY_MAX_AGE_SECONDS: int = 60
+
+    # Connection pool, per engine and per worker process (each service runs a sync and an async engine)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg prepared statements kept per connection
+    DB_EXTERNAL_POOLER: bool = False  # PgBouncer-compatible mode: no prepared statements
+
+    # Per-user friend id sets in Redis (requires REDIS_URL)
+    FRIEND_CACHE_TTL_SECONDS: int = 24 * 3600
+
+    # Friend-of-friend suggestions, precomputed as top-K lists in Redis
+    SUGGESTIONS_TOP_K: int = 50
+    SUGGESTIONS_TTL_SECONDS: int = 7 * 24 * 3600
+    SUGGESTIONS_UPDATE_BUDGET: int = 2000  # list updates per accepted friendship
+    SUGGESTIONS_RECOMPUTE_BUDGET: int = 200000  # second-degree edges scanned on a full recompute
+
+    # Domain event bus on Redis Streams
+    EVENT_BUS_ENABLED: bool = True
+    EVENT_STREAM_MAXLEN: int = 100000  # approximate retention per event type, for replay
+    EVENT_PUBLISH_BATCH_SIZE: int = 100
+    EVENT_PUBLISH_FLUSH_INTERVAL: float = 0.05
+    EVENT_PUBLISH_QUEUE_SIZE: int = 10000
+    EVENT_CONSUMER_GROUP: str = "friendship_service"
+    EVENT_CONSUMER_BATCH_SIZE: int = 100
+    EVENT_CONSUMER_BLOCK_MS: int = 5000
+    EVENT_CLAIM_IDLE_MS: int = 60000  # pending events idle this long are retried
+    EVENT_MAX_DELIVERIES: int = 5  # then the event is moved to <stream>:dead
+    EVENT_DEDUPE_TTL_SECONDS: int = 24 * 3600
+
+    # Transactional outbox relay to the event bus
+    OUTBOX_RELAY_BATCH_SIZE: int = 500
+    OUTBOX_RELAY_INTERVAL_SECONDS: float = 0.2
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,15 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+# create_all() only creates missing tables, so columns and indexes added to
+# existing tables are applied here. Every statement must be idempotent.
+SCHEMA_UPDATES = [
+    "CREATE INDEX IF NOT EXISTS ix_friendships_user_accepted ON friendships (user_id, friend_id) WHERE status = 'ACCEPTED'",
+    "CREATE INDEX IF NOT EXISTS ix_friendships_friend_accepted ON friendships (friend_id, user_id) WHERE status = 'ACCEPTED'",
+]
+
+
+def apply_schema_updates(engine: Engine):
+    with engine.begin() as conn:
+        for statement in SCHEMA_UPDATES:
+            conn.execute(text(statement))
@@ -0,0 +1,77 @@
+import time
+from uuid import uuid4
+from prometheus_client import Gauge, Histogram
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.config.config import settings
+
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds",
+    "Time spent waiting for a connection from the pool",
+    ["engine"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+DB_POOL_IN_USE = Gauge(
+    "db_pool_connections_in_use",
+    "Connections currently checked out of the pool",
+    ["engine"],
+)
+DB_POOL_IDLE = Gauge(
+    "db_pool_connections_idle",
+    "Open connections waiting in the pool",
+    ["engine"],
+)
+
+
+class _CheckoutTimer:
+    engine_label = ""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.labels(self.engine_label).observe(time.perf_counter() - start)
+
+
+class TimedQueuePool(_CheckoutTimer, QueuePool):
+    engine_label = "sync"
+
+
+class TimedAsyncQueuePool(_CheckoutTimer, AsyncAdaptedQueuePool):
+    engine_label = "async"
+
+
+def _pool_options() -> dict:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def engine_options() -> dict:
+    # psycopg2 never prepares statements server-side, so it is pooler-safe as is
+    return {"poolclass": TimedQueuePool, **_pool_options()}
+
+
+def async_engine_options() -> dict:
+    if settings.DB_EXTERNAL_POOLER:
+        # PgBouncer in transaction mode may hand each transaction a different
+        # server connection, so named prepared statements cannot be reused
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    else:
+        connect_args = {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+    return {"poolclass": TimedAsyncQueuePool, "connect_args": connect_args, **_pool_options()}
+
+
+def instrument(engine: Engine, label: str):
+    # Read through engine.pool on every scrape; dispose() swaps in a fresh pool
+    DB_POOL_IN_USE.labels(label).set_function(lambda: engine.pool.checkedout())
+    DB_POOL_IDLE.labels(label).set_function(lambda: engine.pool.checkedin())
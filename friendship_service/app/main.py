@@ -1,8 +1,17 @@
+import asyncio
+import logging
 from fastapi import FastAPI
 from app.api import routes
 from app.db.base import Base
-from app.db.session import engine
+from app.db.session import engine, async_engine
+from app.db.migrations import apply_schema_updates
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import make_asgi_app
+from app.utils.token_cache import start_revocation_listener, stop_revocation_listener
+from app.utils import event_bus
+from app.jobs import outbox_relay
+from app.config.config import settings
+from app.services import suggestion_service
 
 app = FastAPI(title="Everstory Friendship Service")
 
@@ -14,6 +23,45 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+logger = logging.getLogger(__name__)
+
+async def relay_outbox_periodically():
+    while True:
+        try:
+            relayed = await outbox_relay.run()
+        except Exception as e:
+            logger.error(f"Outbox relay failed: {e}")
+            relayed = 0
+        # Keep draining while batches come back full
+        if relayed < settings.OUTBOX_RELAY_BATCH_SIZE:
+            await asyncio.sleep(settings.OUTBOX_RELAY_INTERVAL_SECONDS)
+
+@app.on_event("startup")
+async def startup():
+    start_revocation_listener()
+    if event_bus.publisher:
+        event_bus.publisher.start()
+        app.state.outbox_relay_task = asyncio.create_task(relay_outbox_periodically())
+    app.state.event_consumer = event_bus.consumer({
+        event_bus.FRIENDSHIP_ACCEPTED: suggestion_service.handle_friendship_accepted,
+    })
+    if app.state.event_consumer:
+        app.state.event_consumer.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    if app.state.event_consumer:
+        await app.state.event_consumer.stop()
+    if event_bus.publisher:
+        app.state.outbox_relay_task.cancel()
+        await asyncio.to_thread(event_bus.publisher.stop)
+    await stop_revocation_listener()
+    await async_engine.dispose()
+
 app.include_router(routes.router, prefix="/friendship", tags=["Friendship"])
 
+# Prometheus metrics
+app.mount("/metrics", make_asgi_app())
+
 Base.metadata.create_all(bind=engine)
+apply_schema_updates(engine)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Enum, UniqueConstraint, ForeignKey
+from sqlalchemy import Column, Integer, Enum, Index, UniqueConstraint, ForeignKey, text
 from app.db.base import Base
 from app.enums.status_enum import FriendRequestStatus
 
@@ -12,4 +12,7 @@ class Friendship(Base):
 
     __table_args__ = (
         UniqueConstraint('user_id', 'friend_id', name='unique_friendship'),
+        # Accepted friendships from either side; the second column makes friend-id lookups index-only
+        Index('ix_friendships_user_accepted', 'user_id', 'friend_id', postgresql_where=text("status = 'ACCEPTED'")),
+        Index('ix_friendships_friend_accepted', 'friend_id', 'user_id', postgresql_where=text("status = 'ACCEPTED'")),
     )
@@ -16,3 +16,26 @@ class FriendResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+class FriendIdsResponse(BaseModel):
+    user_id: int
+    friend_ids: list[int]
+
+class AreFriendsResponse(BaseModel):
+    user_id: int
+    other_id: int
+    are_friends: bool
+
+class MutualFriendsResponse(BaseModel):
+    user_id: int
+    other_id: int
+    mutual_friend_ids: list[int]
+    count: int
+
+class FriendSuggestion(BaseModel):
+    user_id: int
+    mutual_friends: int
+
+class FriendSuggestionsResponse(BaseModel):
+    user_id: int
+    suggestions: list[FriendSuggestion]
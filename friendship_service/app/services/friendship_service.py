@@ -1,43 +1,94 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select, union
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.friendship import Friendship
 from app.enums.status_enum import FriendRequestStatus
+from app.utils import friend_cache, event_bus, outbox
 
-def send_friend_request(db: Session, user_id: int, friend_id: int):
+async def send_friend_request(db: AsyncSession, user_id: int, friend_id: int):
     if user_id == friend_id:
         raise ValueError("You cannot send a friend request to yourself")
 
     friendship = Friendship(user_id=user_id, friend_id=friend_id)
     db.add(friendship)
-    db.commit()
-    db.refresh(friendship)
+    await db.commit()
+    await db.refresh(friendship)
     return friendship
 
-def get_sent_requests(db: Session, user_id: int):
-    return db.query(Friendship).filter_by(user_id=user_id).all()
+async def get_sent_requests(db: AsyncSession, user_id: int):
+    return (await db.scalars(select(Friendship).filter_by(user_id=user_id))).all()
 
-def get_received_requests(db: Session, user_id: int):
-    return db.query(Friendship).filter_by(friend_id=user_id).all()
+async def get_received_requests(db: AsyncSession, user_id: int):
+    return (await db.scalars(select(Friendship).filter_by(friend_id=user_id))).all()
 
-def accept_request(db: Session, user_id: int, request_id: int):
-    req = db.query(Friendship).filter_by(id=request_id, friend_id=user_id).first()
+async def accept_request(db: AsyncSession, user_id: int, request_id: int):
+    req = (await db.scalars(select(Friendship).filter_by(id=request_id, friend_id=user_id))).first()
     if not req:
         return None
     req.status = FriendRequestStatus.ACCEPTED
-    db.commit()
-    db.refresh(req)
+    outbox.add_event(db, event_bus.FRIENDSHIP_ACCEPTED, {
+        "request_id": req.id, "user_id": req.user_id, "friend_id": req.friend_id
+    })
+    await db.commit()
+    await db.refresh(req)
+    await friend_cache.add_friendship(req.user_id, req.friend_id)
     return req
 
 
 # Friends who accepted me (I received request and accepted it)
-def get_friends_who_accepted_me(db: Session, user_id: int):
-    return db.query(Friendship).filter(
+async def get_friends_who_accepted_me(db: AsyncSession, user_id: int):
+    return (await db.scalars(select(Friendship).where(
         (Friendship.friend_id == user_id) &
         (Friendship.status == FriendRequestStatus.ACCEPTED)
-    ).all()
+    ))).all()
 
 # Friends I accepted (I sent request and they accepted)
-def get_friends_i_accepted(db: Session, user_id: int):
-    return db.query(Friendship).filter(
+async def get_friends_i_accepted(db: AsyncSession, user_id: int):
+    return (await db.scalars(select(Friendship).where(
         (Friendship.user_id == user_id) &
         (Friendship.status == FriendRequestStatus.ACCEPTED)
-    ).all()
+    ))).all()
+
+
+# All accepted friendships in either direction, in one statement
+async def get_friends(db: AsyncSession, user_id: int):
+    return (await db.scalars(select(Friendship).where(
+        ((Friendship.user_id == user_id) | (Friendship.friend_id == user_id)) &
+        (Friendship.status == FriendRequestStatus.ACCEPTED)
+    ).order_by(Friendship.id))).all()
+
+async def _load_friend_sets(db: AsyncSession, user_ids: list[int]) -> dict[int, set[int]]:
+    # Each branch is an index-only scan on one of the partial ACCEPTED indexes;
+    # UNION also drops the duplicate when both users sent and accepted a request
+    sent = select(Friendship.user_id.label("owner"), Friendship.friend_id.label("id")).where(
+        Friendship.user_id.in_(user_ids) & (Friendship.status == FriendRequestStatus.ACCEPTED)
+    )
+    received = select(Friendship.friend_id.label("owner"), Friendship.user_id.label("id")).where(
+        Friendship.friend_id.in_(user_ids) & (Friendship.status == FriendRequestStatus.ACCEPTED)
+    )
+    friend_sets = {uid: set() for uid in user_ids}
+    for owner, friend_id in (await db.execute(union(sent, received))).all():
+        friend_sets[owner].add(friend_id)
+    return friend_sets
+
+async def get_friend_sets(db: AsyncSession, user_ids: list[int]) -> dict[int, set[int]]:
+    # Read-through: cached sets are served as is, the rest are loaded in one query and cached
+    friend_sets = await friend_cache.get_many(user_ids)
+    missing = list({uid for uid in user_ids if uid not in friend_sets})
+    if missing:
+        loaded = await _load_friend_sets(db, missing)
+        await friend_cache.set_many(loaded)
+        friend_sets.update(loaded)
+    return friend_sets
+
+async def get_friend_ids(db: AsyncSession, user_id: int) -> list[int]:
+    return sorted((await get_friend_sets(db, [user_id]))[user_id])
+
+async def are_friends(db: AsyncSession, user_id: int, other_id: int) -> bool:
+    cached = await friend_cache.is_friend(user_id, other_id)
+    if cached is not None:
+        return cached
+    return other_id in (await get_friend_sets(db, [user_id]))[user_id]
+
+async def mutual_friends(db: AsyncSession, user_id: int, other_id: int) -> list[int]:
+    friend_sets = await get_friend_sets(db, [user_id, other_id])
+    return sorted(friend_sets[user_id] & friend_sets[other_id])
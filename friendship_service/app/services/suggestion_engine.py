@@ -0,0 +1,58 @@
+import heapq
+from collections import Counter
+from itertools import islice
+from typing import Mapping
+
+# Friend-of-friend ranking over in-memory friend sets. Kept free of I/O so it
+# can be benchmarked on synthetic graphs (see benchmarks/suggestions_benchmark.py).
+
+
+def rank_candidates(
+    user_id: int,
+    friends: set[int],
+    friend_sets: Mapping[int, set[int]],
+    k: int,
+    budget: int,
+) -> list[tuple[int, int]]:
+    """Top ``k`` second-degree connections as (candidate_id, mutual_count), scanning at most ~``budget`` edges."""
+    counts = Counter()
+    scanned = 0
+    for friend_id in friends:
+        their_friends = friend_sets.get(friend_id)
+        if not their_friends:
+            continue
+        counts.update(their_friends)
+        scanned += len(their_friends)
+        if scanned >= budget:
+            break
+
+    counts.pop(user_id, None)
+    for friend_id in friends:
+        counts.pop(friend_id, None)
+    # Ties go to the lower id so results are stable between recomputes
+    return heapq.nlargest(k, counts.items(), key=lambda item: (item[1], -item[0]))
+
+
+def mutual_increments(
+    user_id: int,
+    friend_id: int,
+    friends_of_user: set[int],
+    friends_of_friend: set[int],
+    budget: int,
+) -> list[tuple[int, int]]:
+    """(owner, candidate) pairs whose mutual count grows by one once ``user_id`` and ``friend_id`` are friends.
+
+    Every friend of one side that is not already friends with the other side
+    gains the new friend as a mutual, in both directions. At most ``budget``
+    pairs are produced; the rest are picked up by the next full recompute.
+    """
+    pairs = []
+    per_side = budget // 4
+    for new_friend, existing, others in (
+        (friend_id, friends_of_user, friends_of_friend),
+        (user_id, friends_of_friend, friends_of_user),
+    ):
+        for owner in islice(existing - others - {new_friend}, per_side):
+            pairs.append((owner, new_friend))
+            pairs.append((new_friend, owner))
+    return pairs
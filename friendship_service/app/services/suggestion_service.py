@@ -0,0 +1,60 @@
+import logging
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services import friendship_service
+from app.services.suggestion_engine import rank_candidates, mutual_increments
+from app.utils import suggestion_cache
+
+logger = logging.getLogger(__name__)
+
+FRIEND_SET_BATCH_SIZE = 500
+
+
+async def _recompute(db: AsyncSession, user_id: int) -> list[tuple[int, int]]:
+    friends = (await friendship_service.get_friend_sets(db, [user_id]))[user_id]
+
+    # Load friends' friend sets in batches until the edge budget is spent
+    friend_sets = {}
+    scanned = 0
+    ordered = sorted(friends)
+    for i in range(0, len(ordered), FRIEND_SET_BATCH_SIZE):
+        batch = await friendship_service.get_friend_sets(db, ordered[i:i + FRIEND_SET_BATCH_SIZE])
+        friend_sets.update(batch)
+        scanned += sum(len(s) for s in batch.values())
+        if scanned >= settings.SUGGESTIONS_RECOMPUTE_BUDGET:
+            break
+
+    ranked = rank_candidates(
+        user_id, friends, friend_sets, settings.SUGGESTIONS_TOP_K, settings.SUGGESTIONS_RECOMPUTE_BUDGET
+    )
+    await suggestion_cache.replace(user_id, ranked)
+    return ranked
+
+
+async def get_suggestions(db: AsyncSession, user_id: int, limit: int) -> list[dict]:
+    ranked = await suggestion_cache.get(user_id, limit)
+    if ranked is None:
+        ranked = (await _recompute(db, user_id))[:limit]
+    return [{"user_id": candidate, "mutual_friends": count} for candidate, count in ranked]
+
+
+async def on_friendship_accepted(user_id: int, friend_id: int):
+    """Folds a new friendship into the precomputed lists of both sides' friends."""
+    if not suggestion_cache.enabled():
+        return
+
+    try:
+        async with AsyncSessionLocal() as db:
+            friend_sets = await friendship_service.get_friend_sets(db, [user_id, friend_id])
+        increments = mutual_increments(
+            user_id, friend_id, friend_sets[user_id], friend_sets[friend_id], settings.SUGGESTIONS_UPDATE_BUDGET
+        )
+        await suggestion_cache.apply(increments, removals=[(user_id, friend_id), (friend_id, user_id)])
+    except Exception as e:
+        logger.error(f"Suggestion update failed for {user_id}<->{friend_id}: {e}")
+
+
+async def handle_friendship_accepted(event: dict):
+    payload = event["payload"]
+    await on_friendship_accepted(payload["user_id"], payload["friend_id"])
@@ -0,0 +1,85 @@
+import logging
+from typing import Iterable, Optional
+from app.config.config import settings
+from app.utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Each user's friend ids are a Redis set. A set only counts as loaded while it
+# holds the _LOADED sentinel: accepts SADD into both users' sets unconditionally,
+# so a key created that way is partial until the next read tops it up from Postgres.
+_LOADED = "0"  # user ids start at 1
+
+
+def _key(user_id: int) -> str:
+    return f"friends:{user_id}"
+
+
+async def get_many(user_ids: list[int]) -> dict[int, set[int]]:
+    if redis_client is None or not user_ids:
+        return {}
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for uid in user_ids:
+                pipe.smembers(_key(uid))
+            results = await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Friend cache read failed: {e}")
+        return {}
+
+    friend_sets = {}
+    for uid, members in zip(user_ids, results):
+        if _LOADED in members:
+            members.discard(_LOADED)
+            friend_sets[uid] = {int(m) for m in members}
+    return friend_sets
+
+
+async def set_many(friend_sets: dict[int, Iterable[int]]):
+    if redis_client is None or not friend_sets:
+        return
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for uid, friend_ids in friend_sets.items():
+                # SADD rather than replace, so an accept that landed after the load is kept
+                pipe.sadd(_key(uid), _LOADED, *friend_ids)
+                pipe.expire(_key(uid), settings.FRIEND_CACHE_TTL_SECONDS)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Friend cache write failed: {e}")
+
+
+async def add_friendship(user_id: int, friend_id: int):
+    if redis_client is None:
+        return
+    try:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            for uid, other in ((user_id, friend_id), (friend_id, user_id)):
+                pipe.sadd(_key(uid), other)
+                pipe.expire(_key(uid), settings.FRIEND_CACHE_TTL_SECONDS)
+            await pipe.execute()
+    except Exception as e:
+        # Without this update the cached sets would miss the friendship until they expire
+        logger.error(f"Friend cache update failed for {user_id}<->{friend_id}: {e}")
+        await invalidate(user_id, friend_id)
+
+
+async def is_friend(user_id: int, other_id: int) -> Optional[bool]:
+    """O(1) membership check; None when the user's set is not cached."""
+    if redis_client is None:
+        return None
+    try:
+        loaded, member = await redis_client.smismember(_key(user_id), [_LOADED, other_id])
+    except Exception as e:
+        logger.warning(f"Friend cache read failed: {e}")
+        return None
+    return bool(member) if loaded else None
+
+
+async def invalidate(*user_ids: int):
+    if redis_client is None or not user_ids:
+        return
+    try:
+        await redis_client.delete(*[_key(uid) for uid in user_ids])
+    except Exception as e:
+        logger.warning(f"Friend cache invalidation failed for users {user_ids}: {e}")
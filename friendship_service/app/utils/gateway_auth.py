@@ -1,12 +1,24 @@
 import httpx
-from fastapi import HTTPException, Security
+from fastapi import HTTPException, Request, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from jose import jwt
 from app.schemas.friendship_schema import FriendResponse
 from app.config.config import settings
+from app.utils.token_cache import token_cache
+from app.utils.identity_headers import get_trusted_identity
 
 security = HTTPBearer()
 
-async def verify_token(credentials: HTTPAuthorizationCredentials = Security(security)) -> dict:
+async def verify_token(request: Request, credentials: HTTPAuthorizationCredentials = Security(security)) -> dict:
+    # Identity already verified and signed by the gateway
+    trusted = get_trusted_identity(request, credentials.credentials)
+    if trusted is not None:
+        return trusted
+
+    cached = token_cache.get(credentials.credentials)
+    if cached is not None:
+        return cached
+
     async with httpx.AsyncClient() as client:
         try:
             res = await client.get(
@@ -16,6 +28,9 @@ async def verify_token(credentials: HTTPAuthorizationCredentials = Security(secu
             res.raise_for_status()
             if res.status_code != 200:
                 raise HTTPException(status_code=res.status_code, detail="Unauthorized")
-            return res.json()
+            user = res.json()
         except httpx.HTTPStatusError as e:
             raise HTTPException(status_code=e.response.status_code, detail="Unauthorized")
+
+    token_cache.set(credentials.credentials, user, exp=jwt.get_unverified_claims(credentials.credentials).get("exp"))
+    return user
@@ -0,0 +1,39 @@
+import hashlib
+import hmac
+import time
+from typing import Optional
+from fastapi import Request
+from app.config.config import settings
+from app.utils.token_cache import hash_token
+
+
+def _sign_identity(user_id: str, role: str, timestamp: str, method: str, path: str, token: str) -> str:
+    # Must match the gateway: the signature covers the bearer token and the request line
+    message = f"{user_id}\n{role}\n{timestamp}\n{method.upper()}\n{path}\n{hash_token(token)}".encode()
+    return hmac.new(settings.GATEWAY_IDENTITY_SECRET.encode(), message, hashlib.sha256).hexdigest()
+
+
+def get_trusted_identity(request: Request, token: str) -> Optional[dict]:
+    if not settings.GATEWAY_IDENTITY_SECRET:
+        return None
+
+    user_id = request.headers.get("x-user-id")
+    role = request.headers.get("x-user-role", "")
+    timestamp = request.headers.get("x-user-ts")
+    signature = request.headers.get("x-user-signature")
+    if not user_id or not timestamp or not signature:
+        return None
+
+    try:
+        age = abs(time.time() - int(timestamp))
+        user_id = int(user_id)
+    except ValueError:
+        return None
+    if age > settings.GATEWAY_IDENTITY_MAX_AGE_SECONDS:
+        return None
+
+    expected = _sign_identity(str(user_id), role, timestamp, request.method, request.url.path, token)
+    if not hmac.compare_digest(expected, signature):
+        return None
+
+    return {"id": user_id, "role": role or None}
@@ -0,0 +1,5 @@
+from redis.asyncio import Redis
+from app.config.config import settings
+
+# The friend cache is optional; without REDIS_URL every lookup goes to Postgres
+redis_client = Redis.from_url(settings.REDIS_URL, decode_responses=True) if settings.REDIS_URL else None
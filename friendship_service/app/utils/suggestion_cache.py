@@ -0,0 +1,64 @@
+import logging
+from typing import Optional
+from app.config.config import settings
+from app.utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Top-K friend suggestions per user as a sorted set of candidate -> mutual count.
+# The _LOADED sentinel sits at +inf, so it survives trimming and marks a list built
+# by a full recompute; increments that land on a missing key leave a partial list
+# without it, which the next read recomputes.
+_LOADED = "0"  # user ids start at 1
+
+
+def _key(user_id: int) -> str:
+    return f"suggestions:{user_id}"
+
+
+def enabled() -> bool:
+    return redis_client is not None
+
+
+async def get(user_id: int, limit: int) -> Optional[list[tuple[int, int]]]:
+    if redis_client is None:
+        return None
+    try:
+        rows = await redis_client.zrevrange(_key(user_id), 0, limit, withscores=True)
+    except Exception as e:
+        logger.warning(f"Suggestion cache read failed: {e}")
+        return None
+    if not rows or rows[0][0] != _LOADED:
+        return None
+    return [(int(member), int(score)) for member, score in rows[1:] if score > 0]
+
+
+async def replace(user_id: int, ranked: list[tuple[int, int]]):
+    if redis_client is None:
+        return
+    try:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.delete(_key(user_id))
+            pipe.zadd(_key(user_id), {_LOADED: float("inf"), **{str(c): n for c, n in ranked}})
+            pipe.expire(_key(user_id), settings.SUGGESTIONS_TTL_SECONDS)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Suggestion cache write failed for user {user_id}: {e}")
+
+
+async def apply(increments: list[tuple[int, int]], removals: list[tuple[int, int]]):
+    if redis_client is None or not (increments or removals):
+        return
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for owner, candidate in increments:
+                pipe.zincrby(_key(owner), 1, candidate)
+            for owner, candidate in removals:
+                pipe.zrem(_key(owner), candidate)
+            for owner in {owner for owner, _ in increments}:
+                # Keep the sentinel plus the top K
+                pipe.zremrangebyrank(_key(owner), 0, -settings.SUGGESTIONS_TOP_K - 2)
+                pipe.expire(_key(owner), settings.SUGGESTIONS_TTL_SECONDS)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Suggestion cache update failed: {e}")
@@ -0,0 +1,115 @@
+"""Friend suggestion latency on a synthetic social graph.
+
+Run from friendship_service/:
+
+    python -m benchmarks.suggestions_benchmark --edges 1000000
+
+Users are grouped into communities so friends-of-friends overlap the way they
+do on a real graph; a fraction of edges cross communities at random. Timings
+cover the in-process work only (no Postgres or Redis round trips).
+"""
+import argparse
+import random
+import statistics
+import time
+from collections import defaultdict
+
+from app.services.suggestion_engine import mutual_increments, rank_candidates
+
+
+def build_graph(users: int, edges: int, community_size: int, cross_ratio: float, rng: random.Random):
+    adjacency = defaultdict(set)
+    count = 0
+    while count < edges:
+        a = rng.randrange(1, users + 1)
+        if rng.random() < cross_ratio:
+            b = rng.randrange(1, users + 1)
+        else:
+            base = (a - 1) // community_size * community_size
+            b = base + rng.randrange(1, community_size + 1)
+        if a == b or b > users or b in adjacency[a]:
+            continue
+        adjacency[a].add(b)
+        adjacency[b].add(a)
+        count += 1
+    return adjacency
+
+
+def percentiles(samples: list[float]) -> str:
+    ms = sorted(s * 1000 for s in samples)
+    q = statistics.quantiles(ms, n=100)
+    return f"p50={q[49]:.3f}ms p95={q[94]:.3f}ms p99={q[98]:.3f}ms max={ms[-1]:.3f}ms"
+
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--edges", type=int, default=1_000_000)
+    parser.add_argument("--community-size", type=int, default=200)
+    parser.add_argument("--cross-ratio", type=float, default=0.15)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--update-budget", type=int, default=2000)
+    parser.add_argument("--recompute-budget", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    graph = build_graph(args.users, args.edges, args.community_size, args.cross_ratio, rng)
+    degrees = [len(s) for s in graph.values()]
+    print(
+        f"graph: {len(graph)} users, {args.edges} edges, mean degree {statistics.mean(degrees):.1f}, "
+        f"max degree {max(degrees)} (built in {time.perf_counter() - start:.1f}s)"
+    )
+
+    sample = rng.sample(sorted(graph), min(args.requests, len(graph)))
+
+    # Cold path: a full friend-of-friend recompute, as on a cache miss
+    precomputed = {}
+    recompute = []
+    for user_id in sample:
+        start = time.perf_counter()
+        precomputed[user_id] = dict(
+            rank_candidates(user_id, graph[user_id], graph, args.top_k, args.recompute_budget)
+        )
+        recompute.append(time.perf_counter() - start)
+    print(f"full recompute ({len(sample)} users):      {percentiles(recompute)}")
+
+    # Hot path: serving a stored top-K list
+    reads = [
+        timed(lambda uid: sorted(precomputed[uid].items(), key=lambda i: i[1], reverse=True)[:20], uid)
+        for uid in sample
+    ]
+    print(f"precomputed read ({len(sample)} requests): {percentiles(reads)}")
+
+    # Write path: folding a newly accepted friendship into the stored lists
+    updates = []
+    for _ in range(args.events):
+        a, b = rng.sample(sample, 2)
+        if b in graph[a]:
+            continue
+        graph[a].add(b)
+        graph[b].add(a)
+        start = time.perf_counter()
+        pairs = mutual_increments(a, b, graph[a], graph[b], args.update_budget)
+        for owner, candidate in pairs:
+            scores = precomputed.setdefault(owner, {})
+            scores[candidate] = scores.get(candidate, 0) + 1
+            if len(scores) > args.top_k:
+                scores.pop(min(scores, key=scores.get))
+        precomputed.get(a, {}).pop(b, None)
+        precomputed.get(b, {}).pop(a, None)
+        updates.append(time.perf_counter() - start)
+    print(f"incremental update ({len(updates)} events):  {percentiles(updates)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -5,6 +6,40 @@ class Settings(BaseSettings):
     POSTS_SERVICE_URL: str
     GATEWAY_PORT: int = 8010
     FRIENDSHIP_SERVICE_URL: str
+
+    JWT_SECRET: str
+    JWT_ALGORITHM: str = "HS256"
+
+    # "local" verifies JWTs in-process, "remote" asks auth_service on every request
+    AUTH_VERIFY_MODE: str = "local"
+    # In local mode, also check auth_service's session keys in Redis (needs REDIS_URL).
+    # Only turn this off if tokens are short-lived: without it a logged-out token is
+    # accepted until its exp.
+    AUTH_REVOCATION_CHECK: bool = True
+
+    # Shared HMAC key used to sign x-user-* headers for downstream services
+    GATEWAY_IDENTITY_SECRET: Optional[str] = None
+
+    # Token verification cache, invalidated through auth_service's revocation channel;
+    # disabled when REDIS_URL is unset
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    TOKEN_CACHE_TTL_SECONDS: float = 30.0
+    REDIS_URL: Optional[str] = None
+    TOKEN_REVOCATION_CHANNEL: str = "auth:token-revoked"
+
+    # Upstream connection pool (one pool per backend service)
+    UPSTREAM_MAX_CONNECTIONS: int = 100
+    UPSTREAM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    UPSTREAM_KEEPALIVE_EXPIRY: float = 30.0
+    UPSTREAM_CONNECT_TIMEOUT: float = 5.0
+    UPSTREAM_READ_TIMEOUT: float = 30.0
+    UPSTREAM_WRITE_TIMEOUT: float = 30.0
+    UPSTREAM_POOL_TIMEOUT: float = 5.0
+    UPSTREAM_HTTP2: bool = False
+
+    # Stream request/response bodies through the gateway instead of buffering them
+    PROXY_STREAMING: bool = True
+
     class Config:
         env_file = ".env"
 
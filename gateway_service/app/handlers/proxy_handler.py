@@ -0,0 +1,76 @@
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.datastructures import MutableHeaders
+from app.config.config import settings
+from app.handlers.upstream_client import get_client
+
+# Hop-by-hop headers must not be forwarded by proxies (RFC 7230, section 6.1)
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+}
+
+
+def _request_headers(request: Request) -> list[tuple[bytes, bytes]]:
+    return [
+        (name, value)
+        for name, value in request.headers.raw
+        if name.decode("latin-1").lower() not in HOP_BY_HOP_HEADERS | {"host"}
+    ]
+
+
+def _response_headers(headers) -> MutableHeaders:
+    # Appended one by one, so repeated headers such as Set-Cookie are all kept
+    response_headers = MutableHeaders()
+    for name, value in headers.multi_items():
+        if name.lower() not in HOP_BY_HOP_HEADERS:
+            response_headers.append(name, value)
+    return response_headers
+
+
+def _has_body(request: Request) -> bool:
+    return "content-length" in request.headers or "transfer-encoding" in request.headers
+
+
+async def forward_request(service: str, url: str, request: Request) -> Response:
+    client = get_client(service)
+
+    content = None
+    if _has_body(request):
+        content = request.stream() if settings.PROXY_STREAMING else await request.body()
+
+    upstream_request = client.build_request(
+        method=request.method,
+        url=url,
+        params=request.query_params,
+        headers=_request_headers(request),
+        content=content,
+    )
+    upstream_response = await client.send(upstream_request, stream=True)
+
+    if not settings.PROXY_STREAMING:
+        # Keep the body exactly as the upstream encoded it, so the copied
+        # content-encoding/content-length headers still describe it.
+        try:
+            content = b"".join([chunk async for chunk in upstream_response.aiter_raw()])
+        finally:
+            await upstream_response.aclose()
+        return Response(
+            content=content,
+            status_code=upstream_response.status_code,
+            headers=_response_headers(upstream_response.headers),
+        )
+
+    return StreamingResponse(
+        upstream_response.aiter_raw(),
+        status_code=upstream_response.status_code,
+        headers=_response_headers(upstream_response.headers),
+        background=BackgroundTask(upstream_response.aclose),
+    )
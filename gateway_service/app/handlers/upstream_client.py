@@ -0,0 +1,55 @@
+import httpx
+from app.config.config import settings
+
+AUTH = "auth"
+POSTS = "posts"
+FRIENDSHIP = "friendship"
+
+_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def _service_urls() -> dict[str, str]:
+    return {
+        AUTH: settings.AUTH_SERVICE_URL,
+        POSTS: settings.POSTS_SERVICE_URL,
+        FRIENDSHIP: settings.FRIENDSHIP_SERVICE_URL,
+    }
+
+
+def _build_client(base_url: str) -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.UPSTREAM_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.UPSTREAM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.UPSTREAM_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(
+        connect=settings.UPSTREAM_CONNECT_TIMEOUT,
+        read=settings.UPSTREAM_READ_TIMEOUT,
+        write=settings.UPSTREAM_WRITE_TIMEOUT,
+        pool=settings.UPSTREAM_POOL_TIMEOUT,
+    )
+    return httpx.AsyncClient(
+        base_url=base_url,
+        limits=limits,
+        timeout=timeout,
+        http2=settings.UPSTREAM_HTTP2,
+    )
+
+
+async def init_clients():
+    for service, base_url in _service_urls().items():
+        if service not in _clients:
+            _clients[service] = _build_client(base_url)
+
+
+async def close_clients():
+    while _clients:
+        _, client = _clients.popitem()
+        await client.aclose()
+
+
+def get_client(service: str) -> httpx.AsyncClient:
+    client = _clients.get(service)
+    if client is None:
+        raise RuntimeError(f"Upstream client for '{service}' is not initialised")
+    return client
@@ -4,6 +4,9 @@ from app.config.config import settings
 import uvicorn
 import os
 from app.middleware.auth_middleware import AuthMiddleware
+from app.handlers.upstream_client import init_clients, close_clients
+from app.utils.token_cache import start_revocation_listener, stop_revocation_listener
+from app.utils import session_store
 from fastapi.middleware.cors import CORSMiddleware
 
 app = FastAPI(
@@ -19,8 +22,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+@app.on_event("startup")
+async def startup():
+    if settings.AUTH_VERIFY_MODE == "local" and settings.AUTH_REVOCATION_CHECK and not settings.REDIS_URL:
+        raise RuntimeError("AUTH_REVOCATION_CHECK needs REDIS_URL to look up sessions; set it or disable the check")
+    await init_clients()
+    start_revocation_listener()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await stop_revocation_listener()
+    await session_store.close()
+    await close_clients()
+
 # Include routers
 app.include_router(auth_proxy.router, prefix="/auth", tags=["Auth"])
 app.include_router(posts_proxy.router, prefix="/posts", tags=["Posts"])
@@ -1,8 +1,61 @@
 # app/middleware/auth_middleware.py
 
 from fastapi import Request, HTTPException
+from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 import httpx
+from jose import jwt
+from redis.exceptions import RedisError
+from app.config.config import settings
+from app.handlers.upstream_client import get_client, AUTH
+from app.utils.auth_utils import get_user_payload_from_token
+from app.utils.token_cache import token_cache
+from app.utils import session_store
+from app.utils.identity_headers import IDENTITY_HEADERS, build_identity_headers
+
+
+async def _verify_remote(token: str) -> dict:
+    client = get_client(AUTH)
+    try:
+        resp = await client.get(
+            "/auth/me",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        resp.raise_for_status()
+    except httpx.HTTPStatusError:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    payload = resp.json()
+
+    # Ensure required fields exist
+    if "id" not in payload:
+        raise HTTPException(status_code=401, detail="User ID missing in auth payload")
+
+    user = {"id": payload["id"], "role": payload.get("role")}
+    token_cache.set(token, user, exp=jwt.get_unverified_claims(token).get("exp"))
+    return user
+
+
+async def _check_not_revoked(token: str):
+    # A Redis lookup only: no hop to auth_service and no users query
+    try:
+        active = await session_store.is_session_active(token)
+    except RedisError:
+        raise HTTPException(status_code=503, detail="Session store unavailable")
+    if not active:
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+
+
+async def _verify_local(token: str) -> dict:
+    payload = get_user_payload_from_token(token)
+
+    if settings.AUTH_REVOCATION_CHECK:
+        await _check_not_revoked(token)
+
+    user = {"id": payload["user_id"], "role": payload.get("role")}
+    token_cache.set(token, user, exp=payload.get("exp"))
+    return user
+
 
 class AuthMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
@@ -14,32 +67,29 @@ class AuthMiddleware(BaseHTTPMiddleware):
 
         auth_header = request.headers.get("authorization")
         if not auth_header or not auth_header.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Authorization header missing or invalid")
+            return JSONResponse(status_code=401, content={"detail": "Authorization header missing or invalid"})
 
         token = auth_header.split(" ")[1]
 
-        # Verify token with Auth service
-        async with httpx.AsyncClient() as client:
+        user = token_cache.get(token)
+        if user is None:
             try:
-                resp = await client.get(
-                    "http://auth-service:8010/auth/me",
-                    headers={"Authorization": f"Bearer {token}"}
-                )
-                resp.raise_for_status()
-            except httpx.HTTPStatusError:
-                raise HTTPException(status_code=401, detail="Invalid or expired token")
-
-        payload = resp.json()
-
-        # Ensure required fields exist
-        if "id" not in payload:
-            raise HTTPException(status_code=401, detail="User ID missing in auth payload")
-
-        # Inject into headers for internal services
-        request.scope["headers"].append((b"x-user-id", str(payload["id"]).encode()))
-
-        # Optional: inject role only if present
-        if "role" in payload:
-            request.scope["headers"].append((b"x-user-role", payload["role"].encode()))
+                if settings.AUTH_VERIFY_MODE == "remote":
+                    user = await _verify_remote(token)
+                else:
+                    user = await _verify_local(token)
+            except HTTPException as e:
+                return JSONResponse(status_code=e.status_code, content={"detail": e.detail})
+
+        # Never trust identity headers sent by the client
+        headers = [
+            (k, v) for k, v in request.scope["headers"]
+            if k.decode("latin-1").lower() not in IDENTITY_HEADERS
+        ]
+
+        # Inject (signed) identity headers for internal services
+        headers.extend(build_identity_headers(user, request.method, path, token))
+
+        request.scope["headers"] = headers
 
         return await call_next(request)
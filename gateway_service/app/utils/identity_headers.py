@@ -0,0 +1,37 @@
+import hashlib
+import hmac
+import time
+from app.config.config import settings
+from app.utils.token_cache import hash_token
+
+USER_ID_HEADER = "x-user-id"
+USER_ROLE_HEADER = "x-user-role"
+TIMESTAMP_HEADER = "x-user-ts"
+SIGNATURE_HEADER = "x-user-signature"
+
+IDENTITY_HEADERS = {USER_ID_HEADER, USER_ROLE_HEADER, TIMESTAMP_HEADER, SIGNATURE_HEADER}
+
+
+def sign_identity(user_id: str, role: str, timestamp: str, method: str, path: str, token: str) -> str:
+    # Bound to the bearer token and the request line, so a captured header set
+    # cannot be replayed against another endpoint or with another token
+    message = f"{user_id}\n{role}\n{timestamp}\n{method.upper()}\n{path}\n{hash_token(token)}".encode()
+    return hmac.new(settings.GATEWAY_IDENTITY_SECRET.encode(), message, hashlib.sha256).hexdigest()
+
+
+def build_identity_headers(user: dict, method: str, path: str, token: str) -> list[tuple[bytes, bytes]]:
+    user_id = str(user["id"])
+    role = str(user["role"]) if user.get("role") else ""
+
+    headers = [(USER_ID_HEADER.encode(), user_id.encode())]
+
+    # Optional: inject role only if present
+    if role:
+        headers.append((USER_ROLE_HEADER.encode(), role.encode()))
+
+    if settings.GATEWAY_IDENTITY_SECRET:
+        timestamp = str(int(time.time()))
+        headers.append((TIMESTAMP_HEADER.encode(), timestamp.encode()))
+        headers.append((SIGNATURE_HEADER.encode(), sign_identity(user_id, role, timestamp, method, path, token).encode()))
+
+    return headers
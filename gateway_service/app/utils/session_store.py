@@ -0,0 +1,25 @@
+from typing import Optional
+from redis.asyncio import Redis
+from app.config.config import settings
+from app.utils.token_cache import hash_token
+
+_client: Optional[Redis] = None
+
+
+def _get_client() -> Redis:
+    global _client
+    if _client is None:
+        _client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _client
+
+
+async def is_session_active(token: str) -> bool:
+    # auth_service keeps one session:<sha256(token)> key per live login
+    return bool(await _get_client().exists(f"session:{hash_token(token)}"))
+
+
+async def close():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
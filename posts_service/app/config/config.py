@@ -1,13 +1,25 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # Connection pool, per engine and per worker process (each service runs a sync and an async engine)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg prepared statements kept per connection
+    DB_EXTERNAL_POOLER: bool = False  # PgBouncer-compatible mode: no prepared statements
 
     CLOUDINARY_CLOUD_NAME: str
     CLOUDINARY_API_KEY: str
     CLOUDINARY_API_SECRET: str
     CLOUDINARY_UNSIGNED_PRESET : str
+    CLOUDINARY_API_URL: Optional[str] = None  # API base URL override, e.g. a local stub
 
     JWT_SECRET: str
     JWT_ALGORITHM: str
@@ -16,6 +28,62 @@ class Settings(BaseSettings):
     FRIENDSHIP_SERVICE_URL: str
     AUTH_SERVICE_URL: str
 
+    # Token verification cache, invalidated through auth_service's revocation channel;
+    # disabled when REDIS_URL is unset
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    TOKEN_CACHE_TTL_SECONDS: float = 30.0
+    REDIS_URL: Optional[str] = None
+    TOKEN_REVOCATION_CHANNEL: str = "auth:token-revoked"
+
+    # Shared HMAC key for the gateway's signed x-user-* headers
+    GATEWAY_IDENTITY_SECRET: Optional[str] = None
+    GATEWAY_IDENTITY_MAX_AGE_SECONDS: int = 60
+
+    # Shared outbound HTTP client and per-call feed timeouts (seconds)
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_TIMEOUT: float = 10.0
+    FEED_FRIENDS_TIMEOUT: float = 2.0
+    FEED_FOLLOWING_TIMEOUT: float = 2.0
+
+    # Fan-out-on-write home timelines in Redis (requires REDIS_URL)
+    TIMELINE_ENABLED: bool = True
+    TIMELINE_MAX_LENGTH: int = 800
+    TIMELINE_TTL_SECONDS: int = 7 * 24 * 3600
+    TIMELINE_FANOUT_LIMIT: int = 10000  # authors above this are merged on read
+
+    # Per-post read-through cache (requires REDIS_URL)
+    POST_CACHE_TTL_SECONDS: int = 3600
+
+    # Public profile listings and username resolution (require REDIS_URL)
+    PUBLIC_POSTS_CACHE_TTL_SECONDS: int = 300
+    USERNAME_CACHE_TTL_SECONDS: int = 3600
+    USERNAME_MISS_TTL_SECONDS: int = 60
+
+    # Domain event bus on Redis Streams
+    EVENT_BUS_ENABLED: bool = True
+    EVENT_STREAM_MAXLEN: int = 100000  # approximate retention per event type, for replay
+    EVENT_PUBLISH_BATCH_SIZE: int = 100
+    EVENT_PUBLISH_FLUSH_INTERVAL: float = 0.05
+    EVENT_PUBLISH_QUEUE_SIZE: int = 10000
+    EVENT_CONSUMER_GROUP: str = "posts_service"
+    EVENT_CONSUMER_BATCH_SIZE: int = 100
+    EVENT_CONSUMER_BLOCK_MS: int = 5000
+    EVENT_CLAIM_IDLE_MS: int = 60000  # pending events idle this long are retried
+    EVENT_MAX_DELIVERIES: int = 5  # then the event is moved to <stream>:dead
+    EVENT_DEDUPE_TTL_SECONDS: int = 24 * 3600
+
+    # Transactional outbox relay to the event bus
+    OUTBOX_RELAY_BATCH_SIZE: int = 500
+    OUTBOX_RELAY_INTERVAL_SECONDS: float = 0.2
+
+    # Background Cloudinary deletion of soft-deleted posts' assets
+    ASSET_DELETION_BATCH_SIZE: int = 100  # Cloudinary's bulk delete limit
+    ASSET_DELETION_INTERVAL_SECONDS: float = 5.0
+    ASSET_DELETION_MAX_ATTEMPTS: int = 8  # then the row is dead-lettered
+    ASSET_DELETION_BACKOFF_SECONDS: float = 30.0
+    ASSET_DELETION_MAX_BACKOFF_SECONDS: float = 3600.0
+
     class Config:
         env_file = ".env"
 
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.schemas.post_schema import *
-from app.services import post_service
+from app.services import post_service, timeline_service
+from app.enums.post_type_enum import PostType
 from app.utils.token_utils import verify_token
-from app.db.session import get_db
+from app.db.session import get_async_db
 
 router = APIRouter()
 security = HTTPBearer()
@@ -12,11 +14,40 @@ security = HTTPBearer()
 @router.post("/create", response_model=CreatePostResponse, summary="Generate Cloudinary upload URL")
 async def create_post_route(
     payload: CreatePostRequest,
+    background_tasks: BackgroundTasks,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(verify_token)
 ):
-    return post_service.create_post(db, user_id=user["id"], is_private=payload.is_private, type=payload.type)
+    post = await post_service.create_post(db, user_id=user["id"], is_private=payload.is_private, type=payload.type)
+    if payload.type == PostType.POST:
+        background_tasks.add_task(
+            timeline_service.fan_out_posts,
+            [post["post_id"]], user["id"], payload.is_private, post["created_at"], user["token"]
+        )
+    return post
+
+@router.post(
+    "/create-batch",
+    response_model=list[CreatePostResponse],
+    summary="Reserve upload slots for a multi-image post"
+)
+async def create_post_batch_route(
+    payload: CreatePostBatchRequest,
+    background_tasks: BackgroundTasks,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(verify_token)
+):
+    posts = await post_service.create_posts(
+        db, user_id=user["id"], is_private=payload.is_private, type=payload.type, count=payload.count
+    )
+    if payload.type == PostType.POST:
+        background_tasks.add_task(
+            timeline_service.fan_out_posts,
+            [p["post_id"] for p in posts], user["id"], payload.is_private, posts[0]["created_at"], user["token"]
+        )
+    return posts
 
 @router.get("/me", response_model=list[PostResponse], summary="Get your posts")
 async def get_my_posts_route(
@@ -24,60 +55,110 @@ async def get_my_posts_route(
     limit: int = 10,
     is_private: bool = None,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(verify_token)
 ):
-    return post_service.get_my_posts(db, user_id=user["id"], skip=skip, limit=limit, is_private=is_private)
+    return await post_service.get_my_posts(db, user_id=user["id"], skip=skip, limit=limit, is_private=is_private)
 
 @router.get("/posts/{post_id}", response_model=PostDetailResponse, summary="Get post by ID")
 async def get_post_by_id_route(
     post_id: int,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(verify_token)
 ):
-    return post_service.get_post_by_id(db, user_id=user["id"], post_id=post_id)
+    return await post_service.get_post_by_id(db, user_id=user["id"], post_id=post_id)
 
 @router.put("/posts/{post_id}", response_model=PostResponse, summary="Update post privacy")
 async def update_post_route(
     post_id: int,
     payload: UpdatePostRequest,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(verify_token)
 ):
-    return post_service.update_post(db, user_id=user["id"], post_id=post_id, is_private=payload.is_private)
+    return await post_service.update_post(db, user_id=user["id"], post_id=post_id, is_private=payload.is_private)
 
 @router.delete("/posts/{post_id}", response_model=MessageResponse, summary="Delete post")
 async def delete_post_route(
     post_id: int,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(verify_token)
+):
+    return await post_service.delete_post(db, user_id=user["id"], post_id=post_id)
+
+
+@router.post("/batch", response_model=list[PostDetailResponse], summary="Get many posts by ID")
+async def get_posts_batch_route(
+    payload: PostBatchRequest,
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(verify_token)
 ):
-    return post_service.delete_post(db, user_id=user["id"], post_id=post_id)
+    posts = await post_service.get_posts_by_ids(db, payload.ids)
+    return [p for p in posts if not p["is_private"] or p["user_id"] == user["id"]]
 
 
-@router.get("/feed", response_model=list[PostDetailResponse], summary="Recommended Feed")
+@router.get(
+    "/feed",
+    response_model=list[PostDetailResponse],
+    summary="Recommended Feed",
+    description="Pass the X-Next-Cursor response header back as `cursor` to fetch the next page."
+)
 async def get_feed(
+    response: Response,
+    background_tasks: BackgroundTasks,
     skip: int = 0,
     limit: int = 10,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(verify_token)  # Use gateway-auth verified token
 ):
-    return await post_service.get_recommended_posts(
-        db=db,
-        token=user["token"],  # We'll make this available via patch below
-        user_id=user["id"],
-        skip=skip,
-        limit=limit
-    )
+    timeline = None
+    if not skip:
+        timeline = await timeline_service.get_timeline(db, user["token"], user["id"], limit=limit, cursor=cursor)
+
+    if timeline is not None:
+        posts, next_cursor = timeline
+    else:
+        posts, next_cursor = await post_service.get_recommended_posts(
+            db=db,
+            token=user["token"],  # We'll make this available via patch below
+            user_id=user["id"],
+            skip=skip,
+            limit=limit,
+            cursor=cursor
+        )
+        if not skip and not cursor:
+            # Cold or evicted timeline: materialize it for the next request
+            background_tasks.add_task(timeline_service.rebuild_timeline, user["token"], user["id"])
 
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return posts
 
-@router.get("/user/{username}/public", response_model=list[PostResponse], summary="Get public posts of a user by username")
+
+@router.get(
+    "/user/{username}/public",
+    response_model=list[PostResponse],
+    summary="Get public posts of a user by username",
+    description="Paginated and cacheable: pass X-Next-Cursor back as `cursor`, and the ETag as If-None-Match for a 304."
+)
 async def get_public_posts_by_username(
     username: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return await post_service.get_public_posts_by_username(username=username, db=db)
-
+    posts, next_cursor, etag = await post_service.get_public_posts_by_username(
+        username=username, db=db, limit=limit, cursor=cursor, if_none_match=request.headers.get("if-none-match")
+    )
+    headers = {"ETag": etag, "Cache-Control": "public, no-cache"}
+    if posts is None:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return posts
@@ -0,0 +1,15 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+# create_all() only creates missing tables, so columns and indexes added to
+# existing tables are applied here. Every statement must be idempotent.
+SCHEMA_UPDATES = [
+    "CREATE INDEX IF NOT EXISTS ix_posts_user_type_private_created ON posts (user_id, type, is_private, created_at DESC)",
+    "ALTER TABLE posts ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP",
+]
+
+
+def apply_schema_updates(engine: Engine):
+    with engine.begin() as conn:
+        for statement in SCHEMA_UPDATES:
+            conn.execute(text(statement))
@@ -3,13 +3,26 @@
 from sqlalchemy.orm import Session
 from app.db.base import Base  # assuming you've defined your Base here
 from app.config.config import settings
+from app.db.pool import engine_options, async_engine_options, instrument
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 # Set up engine and sessionmaker
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(settings.DATABASE_URL, **engine_options())
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine (asyncpg) for request handlers, derived from DATABASE_URL unless overridden
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or make_url(settings.DATABASE_URL).set(drivername="postgresql+asyncpg"),
+    **async_engine_options()
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+instrument(engine, "sync")
+instrument(async_engine.sync_engine, "async")
+
 # Dependency function to use in routes/services
 def get_db() -> Session:
     db = SessionLocal()
@@ -17,3 +30,7 @@ def get_db() -> Session:
         yield db
     finally:
         db.close()
+
+async def get_async_db() -> AsyncSession:
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,73 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.asset_deletion import AssetDeletion
+from app.models.post import Post
+from app.utils.cloudinary_utils import delete_assets_from_cloudinary, public_id_from_url
+
+logger = logging.getLogger(__name__)
+
+# Statuses Cloudinary reports for an asset that is gone
+DELETED_STATUSES = ("deleted", "not_found")
+
+
+def _backoff(attempts: int) -> timedelta:
+    seconds = settings.ASSET_DELETION_BACKOFF_SECONDS * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, settings.ASSET_DELETION_MAX_BACKOFF_SECONDS))
+
+
+async def process_batch(db: AsyncSession) -> int:
+    """Deletes one batch of due assets with a single bulk API call; returns how many rows were processed.
+
+    Purged assets take their post row with them. Failures are retried with
+    exponential backoff and dead-lettered after ASSET_DELETION_MAX_ATTEMPTS.
+    """
+    now = datetime.utcnow()
+    rows = (await db.scalars(
+        select(AssetDeletion)
+        .where(AssetDeletion.dead_at.is_(None), AssetDeletion.next_attempt_at <= now)
+        .order_by(AssetDeletion.next_attempt_at)
+        .limit(min(settings.ASSET_DELETION_BATCH_SIZE, 100))
+        .with_for_update(skip_locked=True)
+    )).all()
+    if not rows:
+        await db.rollback()
+        return 0
+
+    public_ids = {row.id: public_id_from_url(row.asset_url) for row in rows if row.asset_url}
+    statuses, error = {}, None
+    if public_ids:
+        try:
+            statuses = await asyncio.to_thread(delete_assets_from_cloudinary, sorted(set(public_ids.values())))
+        except Exception as e:
+            error = str(e)
+
+    done = []
+    for row in rows:
+        status = statuses.get(public_ids[row.id]) if row.id in public_ids else "not_found"
+        if status in DELETED_STATUSES:
+            done.append(row)
+            continue
+
+        row.attempts += 1
+        row.last_error = error or f"Cloudinary returned {status!r}"
+        if row.attempts >= settings.ASSET_DELETION_MAX_ATTEMPTS:
+            row.dead_at = now
+            logger.error(f"Dead-lettered asset deletion for post {row.post_id} after {row.attempts} attempts: {row.last_error}")
+        else:
+            row.next_attempt_at = now + _backoff(row.attempts)
+
+    if done:
+        await db.execute(delete(Post).where(Post.id.in_([row.post_id for row in done])))
+        await db.execute(delete(AssetDeletion).where(AssetDeletion.id.in_([row.id for row in done])))
+    await db.commit()
+    return len(rows)
+
+
+async def run():
+    async with AsyncSessionLocal() as db:
+        return await process_batch(db)
@@ -0,0 +1,36 @@
+import asyncio
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.outbox_event import OutboxEvent
+from app.utils import event_bus
+from app.utils.outbox import to_event
+
+
+async def relay_batch(db: AsyncSession) -> int:
+    """Publish the oldest committed outbox events and delete them; returns how many were relayed.
+
+    SKIP LOCKED lets every worker process relay concurrently without publishing
+    the same rows. A crash between publish and commit republishes the batch,
+    which consumers drop by event id.
+    """
+    rows = (await db.scalars(
+        select(OutboxEvent)
+        .order_by(OutboxEvent.id)
+        .limit(settings.OUTBOX_RELAY_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )).all()
+    if not rows:
+        await db.rollback()
+        return 0
+
+    await asyncio.to_thread(event_bus.publisher.publish_batch, [to_event(row) for row in rows])
+    await db.execute(delete(OutboxEvent).where(OutboxEvent.id.in_([row.id for row in rows])))
+    await db.commit()
+    return len(rows)
+
+
+async def run():
+    async with AsyncSessionLocal() as db:
+        return await relay_batch(db)
@@ -1,11 +1,21 @@
+import asyncio
+import logging
 import os
 import uvicorn
 from fastapi import FastAPI
 from app.controllers import post_controller
 from app.db.base import Base
-from app.db.session import engine
+from app.db.session import engine, async_engine
+from app.db.migrations import apply_schema_updates
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import make_asgi_app
 from tenacity import retry, stop_after_attempt, wait_fixed
+from app.utils.token_cache import start_revocation_listener, stop_revocation_listener
+from app.utils.http_client import init_client, close_client
+from app.utils import event_bus
+from app.jobs import outbox_relay, asset_deletion
+from app.config.config import settings
+from app.services import post_service, timeline_service
 
 app = FastAPI(
     title="Everstory Posts Service",
@@ -25,14 +35,70 @@ app.add_middleware(
 @retry(stop=stop_after_attempt(5), wait=wait_fixed(2))
 def create_tables():
     Base.metadata.create_all(bind=engine)
+    apply_schema_updates(engine)
 
 @app.on_event("startup")
 def startup():
     create_tables()
 
+logger = logging.getLogger(__name__)
+
+async def relay_outbox_periodically():
+    while True:
+        try:
+            relayed = await outbox_relay.run()
+        except Exception as e:
+            logger.error(f"Outbox relay failed: {e}")
+            relayed = 0
+        # Keep draining while batches come back full
+        if relayed < settings.OUTBOX_RELAY_BATCH_SIZE:
+            await asyncio.sleep(settings.OUTBOX_RELAY_INTERVAL_SECONDS)
+
+async def delete_assets_periodically():
+    while True:
+        try:
+            processed = await asset_deletion.run()
+        except Exception as e:
+            logger.error(f"Asset deletion failed: {e}")
+            processed = 0
+        if processed < settings.ASSET_DELETION_BATCH_SIZE:
+            await asyncio.sleep(settings.ASSET_DELETION_INTERVAL_SECONDS)
+
+@app.on_event("startup")
+async def start_listeners():
+    await init_client()
+    start_revocation_listener()
+    app.state.asset_deletion_task = asyncio.create_task(delete_assets_periodically())
+    if event_bus.publisher:
+        event_bus.publisher.start()
+        app.state.outbox_relay_task = asyncio.create_task(relay_outbox_periodically())
+    app.state.event_consumer = event_bus.consumer({
+        event_bus.FRIENDSHIP_ACCEPTED: timeline_service.handle_graph_event,
+        event_bus.FOLLOW_CREATED: timeline_service.handle_graph_event,
+        event_bus.FOLLOW_DELETED: timeline_service.handle_graph_event,
+        event_bus.USER_UPDATED: post_service.handle_user_updated,
+    })
+    if app.state.event_consumer:
+        app.state.event_consumer.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    app.state.asset_deletion_task.cancel()
+    if app.state.event_consumer:
+        await app.state.event_consumer.stop()
+    if event_bus.publisher:
+        app.state.outbox_relay_task.cancel()
+        await asyncio.to_thread(event_bus.publisher.stop)
+    await stop_revocation_listener()
+    await close_client()
+    await async_engine.dispose()
+
 # Add routes
 app.include_router(post_controller.router, prefix="/posts", tags=["Posts"])
 
+# Prometheus metrics
+app.mount("/metrics", make_asgi_app())
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8020))
     uvicorn.run("app.main:app", host="0.0.0.0", port=port, reload=True)
@@ -0,0 +1,26 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String, Text, text
+from app.db.base import Base
+
+UTC_NOW = text("(now() at time zone 'utc')")
+
+
+class AssetDeletion(Base):
+    """Cloudinary asset of a soft-deleted post, waiting for the deletion worker.
+
+    Rows with dead_at set exhausted their retries and form the dead-letter list;
+    clearing dead_at and attempts puts them back in the queue.
+    """
+    __tablename__ = "asset_deletions"
+
+    id = Column(BigInteger, primary_key=True)
+    post_id = Column(Integer, nullable=False)
+    asset_url = Column(String, nullable=True)
+    attempts = Column(Integer, nullable=False, server_default=text("0"))
+    next_attempt_at = Column(DateTime, nullable=False, server_default=UTC_NOW)
+    last_error = Column(Text, nullable=True)
+    dead_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=UTC_NOW)
+
+    __table_args__ = (
+        Index("ix_asset_deletions_due", "next_attempt_at", postgresql_where=text("dead_at IS NULL")),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
 from datetime import datetime
 from app.db.base import Base
 from app.enums.post_type_enum import PostType
@@ -14,5 +14,10 @@ class Post(Base):
     type = Column()
     is_private = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    deleted_at = Column(DateTime, nullable=True)  # soft delete; the row goes once its asset is purged
     type = Column(Enum(PostType), default=PostType.POST)
-    
+
+    __table_args__ = (
+        # Serves the feed's per-author branches and their (created_at, id) keyset
+        Index("ix_posts_user_type_private_created", "user_id", "type", "is_private", created_at.desc()),
+    )
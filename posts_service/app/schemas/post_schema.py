@@ -1,16 +1,20 @@
 from typing import Optional
 from pydantic import BaseModel, Field
+from app.enums.post_type_enum import PostType
 
 class CreatePostRequest(BaseModel):
     is_private: bool = Field(default=False, description="Set to true to make the post private.")
-    type: str = Field(default="POST", description = "Set to PFP to upload Profile Picture")
+    type: PostType = Field(default=PostType.POST, description = "Set to PFP to upload Profile Picture")
+
+class CreatePostBatchRequest(CreatePostRequest):
+    count: int = Field(..., ge=1, le=10, description="Number of images in the post.")
 
 class CreatePostResponse(BaseModel):
     post_id: int = Field(..., example=101)
-    upload_url: str = Field(..., example="https://res.cloudinary.com/your_cloud/image/upload/v123/post_101")
+    upload_url: str = Field(..., example="https://api.cloudinary.com/v1_1/your_cloud/image/upload")
     is_private: bool = Field(..., example=True)
     upload_preset: str= Field(..., example="my_upload_preset")
-    public_id: str= Field(..., example="https://res.cloudinary.com/my_cloud/image/upload/pid.fmt")   
+    public_id: str= Field(..., example="post_01J9Z3Q4X8M2K7B5R6T1V0W9YC")
 
 class ErrorResponse(BaseModel):
     detail: str = Field(..., example="Invalid token format")
@@ -25,6 +29,9 @@ class PostResponse(BaseModel):
 class PostDetailResponse(PostResponse):
     user_id: int
 
+class PostBatchRequest(BaseModel):
+    ids: list[int] = Field(..., max_length=100, example=[101, 102, 103])
+
 class UpdatePostRequest(BaseModel):
     is_private: bool = Field(..., example=True)
 
@@ -1,46 +1,94 @@
+from typing import Optional
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from datetime import datetime
+from sqlalchemy import Integer, any_, bindparam, insert, select, tuple_, union_all, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 from app.models.post import Post
+from app.models.asset_deletion import AssetDeletion
 from app.enums.post_type_enum import PostType
-from app.utils.cloudinary_utils import generate_upload_url, delete_asset_from_cloudinary, get_download_url
+from app.utils.cloudinary_utils import generate_upload_url, get_download_url
+from app.utils.cursor_utils import encode_cursor, decode_cursor
+from app.utils.ulid import new_ulid
+import asyncio
+import hashlib
+import json
 import httpx
 from app.config.config import settings
+from app.utils.http_client import get_client
+from app.utils import post_cache, event_bus, outbox, public_posts_cache, username_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def create_post(db: Session, user_id: int, is_private: bool, type: PostType):
-    new_post = Post(user_id=user_id, is_private=is_private, type=type)
-    db.add(new_post)
-    db.commit()
-    db.refresh(new_post)
+def _public_id(type: PostType) -> str:
+    # Generated up front, so asset_url is part of the INSERT instead of a second UPDATE
+    return f"{'post' if type == PostType.POST else 'pfp'}_{new_ulid()}"
 
-    public_id = f"{'post' if type == PostType.POST else 'pfp'}_{new_post.id}"
-    upload_creds = generate_upload_url()
-    new_post.asset_url = get_download_url(public_id)
-    db.commit()
-
-    return {
-        "post_id": new_post.id,
-        "upload_url": upload_creds["upload_url"],
-        "upload_preset": upload_creds["upload_preset"],
-        "is_private": new_post.is_private,
-        "public_id": public_id,
-    }
 
+async def create_posts(db: AsyncSession, user_id: int, is_private: bool, type: PostType, count: int = 1) -> list[dict]:
+    """Reserves ``count`` upload slots in a single INSERT and a single commit."""
+    created_at = datetime.utcnow()
+    public_ids = [_public_id(type) for _ in range(count)]
+    rows = (await db.execute(
+        insert(Post)
+        .values([
+            {
+                "user_id": user_id,
+                "is_private": is_private,
+                "type": type,
+                "asset_url": get_download_url(public_id),
+                "created_at": created_at,
+            }
+            for public_id in public_ids
+        ])
+        .returning(Post.id, Post.asset_url)
+    )).all()
+    # RETURNING order is not guaranteed for multi-row inserts; match rows back by their asset_url
+    post_ids = {asset_url: post_id for post_id, asset_url in rows}
 
-def get_my_posts(db: Session, user_id: int, skip: int, limit: int, is_private: bool = None):
-    query = db.query(Post).filter(Post.user_id == user_id, Post.type == PostType.POST)
+    upload_creds = generate_upload_url()
+    posts = []
+    for public_id in public_ids:
+        post_id = post_ids[get_download_url(public_id)]
+        outbox.add_event(db, event_bus.POST_CREATED, {
+            "post_id": post_id,
+            "user_id": user_id,
+            "is_private": is_private,
+            "type": type.value,
+            "created_at": created_at,
+        })
+        posts.append({
+            "post_id": post_id,
+            "upload_url": upload_creds["upload_url"],
+            "upload_preset": upload_creds["upload_preset"],
+            "is_private": is_private,
+            "public_id": public_id,
+            "created_at": created_at,
+        })
+    await db.commit()
+    if not is_private and type == PostType.POST:
+        await public_posts_cache.bump(user_id)
+    return posts
+
+
+async def create_post(db: AsyncSession, user_id: int, is_private: bool, type: PostType):
+    return (await create_posts(db, user_id, is_private, type))[0]
+
+
+async def get_my_posts(db: AsyncSession, user_id: int, skip: int, limit: int, is_private: bool = None):
+    query = select(Post).where(Post.user_id == user_id, Post.type == PostType.POST, Post.deleted_at.is_(None))
     if is_private is not None:
-        query = query.filter(Post.is_private == is_private)
-    posts = query.offset(skip).limit(limit).all()
+        query = query.where(Post.is_private == is_private)
+    posts = (await db.scalars(query.offset(skip).limit(limit))).all()
     return [{"id": p.id, "asset_url": p.asset_url, "user_id": p.user_id, "is_private": p.is_private, "type": p.type} for p in posts]
 
 
-def get_post_by_id(db: Session, user_id: int, post_id: int):
-    post = db.query(Post).filter(Post.id == post_id).first()
-    if not post:
+async def get_post_by_id(db: AsyncSession, user_id: int, post_id: int):
+    post = await db.get(Post, post_id)
+    if not post or post.deleted_at:
         raise HTTPException(status_code=404, detail="Post not found")
     if post.user_id != user_id and post.is_private:
         raise HTTPException(status_code=403, detail="Unauthorized to view this private post")
@@ -53,124 +101,185 @@ def get_post_by_id(db: Session, user_id: int, post_id: int):
     }
 
 
-def update_post(db: Session, user_id: int, post_id: int, is_private: bool):
-    post = db.query(Post).filter(Post.id == post_id).first()
-    if not post:
+async def update_post(db: AsyncSession, user_id: int, post_id: int, is_private: bool):
+    post = await db.get(Post, post_id)
+    if not post or post.deleted_at:
         raise HTTPException(status_code=404, detail="Post not found")
     if post.user_id != user_id:
         raise HTTPException(status_code=403, detail="You don't own this post")
     post.is_private = is_private
-    db.commit()
-    db.refresh(post)
-    return {"id": post.id, "asset_url": post.asset_url, "is_private": post.is_private, "type": post.type}
-
-
-def delete_post(db: Session, user_id: int, post_id: int):
-    post = db.query(Post).filter(Post.id == post_id).first()
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
-    if post.user_id != user_id:
+    await db.commit()
+    await db.refresh(post)
+    await post_cache.invalidate(post.id)
+    await public_posts_cache.bump(post.user_id)
+    return {"id": post.id, "user_id": post.user_id, "asset_url": post.asset_url, "is_private": post.is_private, "type": post.type}
+
+
+async def delete_post(db: AsyncSession, user_id: int, post_id: int):
+    # Soft delete and enqueue the asset in one statement; Cloudinary is called by the deletion worker
+    deleted = (
+        update(Post)
+        .where(Post.id == post_id, Post.user_id == user_id, Post.deleted_at.is_(None))
+        .values(deleted_at=datetime.utcnow())
+        .returning(Post.id, Post.asset_url)
+        .cte("deleted")
+    )
+    queued = (await db.execute(
+        insert(AssetDeletion)
+        .from_select(["post_id", "asset_url"], select(deleted.c.id, deleted.c.asset_url))
+        .returning(AssetDeletion.id)
+    )).first()
+
+    if not queued:
+        await db.rollback()
+        post = await db.get(Post, post_id)
+        if not post or post.deleted_at:
+            raise HTTPException(status_code=404, detail="Post not found")
         raise HTTPException(status_code=403, detail="You don't own this post")
-    if post.asset_url:
-        public_id = post.asset_url.split("/")[-1].split(".")[0]
-        delete_asset_from_cloudinary(f"everstory/{public_id}")
-    db.delete(post)
-    db.commit()
+
+    await db.commit()
+    await post_cache.invalidate(post_id)
+    await public_posts_cache.bump(user_id)
     return {"message": "Post deleted successfully."}
 
 
+async def get_posts_by_ids(db: AsyncSession, post_ids: list[int]) -> list[dict]:
+    """Bulk read-through lookup; returns the found posts in the requested order."""
+    post_ids = list(dict.fromkeys(post_ids))
+    found = await post_cache.get_many(post_ids)
+
+    missing = [pid for pid in post_ids if pid not in found]
+    if missing:
+        # A single array parameter keeps one statement shape regardless of the batch size
+        rows = (await db.scalars(
+            select(Post).where(
+                Post.id == any_(bindparam("post_ids", missing, type_=ARRAY(Integer))),
+                Post.deleted_at.is_(None)
+            )
+        )).all()
+        loaded = [
+            {
+                "id": p.id,
+                "user_id": p.user_id,
+                "asset_url": p.asset_url,
+                "is_private": p.is_private,
+                "type": p.type.value if p.type else None,
+                "created_at": p.created_at,
+            }
+            for p in rows
+        ]
+        await post_cache.set_many(loaded)
+        found.update({post["id"]: post for post in loaded})
+
+    return [found[pid] for pid in post_ids if pid in found]
+
+
+async def fetch_friend_ids(client: httpx.AsyncClient, token: str, user_id: int) -> set[int]:
+    try:
+        res = await client.get(
+            f"{settings.FRIENDSHIP_SERVICE_URL}/friendship/friends",
+            params={"ids_only": "true"},
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=settings.FEED_FRIENDS_TIMEOUT
+        )
+    except Exception:
+        raise HTTPException(status_code=500, detail="Error fetching friends")
+
+    if res.status_code != 200:
+        return set()
+    friend_ids = res.json().get("friend_ids")
+    if not isinstance(friend_ids, list):
+        raise HTTPException(status_code=500, detail="Friendship response is not a list")
+    return set(friend_ids)
+
+
+async def fetch_following_ids(client: httpx.AsyncClient, token: str, user_id: int) -> set[int]:
+    following_ids = set()
+    params = {"limit": 1000}
+    while True:
+        res = await client.get(
+            f"{settings.AUTH_SERVICE_URL}/auth/following/{user_id}",
+            params=params,
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=settings.FEED_FOLLOWING_TIMEOUT
+        )
+        res.raise_for_status()
+        body = res.json()
+        data = body.get("following", [])
+        if isinstance(data, list):
+            following_ids.update(f["id"] for f in data if "id" in f)
+        if not body.get("next_cursor"):
+            return following_ids
+        params["after_id"] = body["next_cursor"]
+
+
 async def get_recommended_posts(
-    db: Session,
+    db: AsyncSession,
     token: str,
     user_id: int,
     skip: int = 0,
-    limit: int = 10
-) -> list[dict]:
+    limit: int = 10,
+    cursor: Optional[str] = None
+) -> tuple[list[dict], Optional[str]]:
+    after = decode_cursor(cursor) if cursor else None
+
     try:
-        async with httpx.AsyncClient() as client:
-            # Step 1: Auth
-            user_res = await client.get(
-                f"{settings.AUTH_VERIFY_URL}",
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            user_res.raise_for_status()
-            user = user_res.json()
-            user_id = user.get("id")
-            if not user_id:
-                raise HTTPException(status_code=401, detail="User ID missing in auth response")
-
-            # Step 2: Get Friends
-            friends_incoming = []
-            friends_outgoing = []
-
-            try:
-                res = await client.get(
-                    f"{settings.FRIENDSHIP_SERVICE_URL}/friendship/friends/incoming",
-                    headers={"Authorization": f"Bearer {token}"}
-                )
-                if res.status_code == 200:
-                    friends_incoming = res.json()
-            except Exception:
-                raise HTTPException(status_code=500, detail="Error fetching incoming friends")
-            
-            try:
-                res = await client.get(
-                    f"{settings.FRIENDSHIP_SERVICE_URL}/friendship/friends/outgoing",
-                    headers={"Authorization": f"Bearer {token}"}
-                )
-                if res.status_code == 200:
-                    friends_outgoing = res.json()
-            except Exception:
-                raise HTTPException(status_code=500, detail="Error fetching outgoing friends")
-
-            if not isinstance(friends_incoming, list) or not isinstance(friends_outgoing, list):
-                raise HTTPException(status_code=500, detail="Friendship response is not a list")
-            
-
-            friends = set()
-            for f in friends_incoming + friends_outgoing:
-                if f["user_id"] == user_id:
-                    friends.add(f["friend_id"])
-                else:
-                    friends.add(f["user_id"])
-
-            # Step 3: Get Following (excluding friends)
-            following_ids = set()
-            try:
-                res = await client.get(
-                    f"{settings.AUTH_SERVICE_URL}/auth/following/{user_id}",
-                    headers={"Authorization": f"Bearer {token}"}
-                )
-                if res.status_code == 200:
-                    data = res.json().get("following", [])
-                    if isinstance(data, list):
-                        following_ids = {f["id"] for f in data if "id" in f}
-            except Exception:
-                pass
-
-            only_following = following_ids - friends
-
-        # Step 4: Get Posts (ordered by newest first)
-        private_from_friends = db.query(Post).filter(
-            Post.user_id.in_(friends),
-            Post.is_private.is_(True),
-            Post.type == PostType.POST
+        # The caller is already authenticated by verify_token, so friends and
+        # following are fetched concurrently without re-verifying the token.
+        client = get_client()
+        friends_result, following_result = await asyncio.gather(
+            fetch_friend_ids(client, token, user_id),
+            fetch_following_ids(client, token, user_id),
+            return_exceptions=True
         )
 
-        public_from_friends = db.query(Post).filter(
-            Post.user_id.in_(friends),
-            Post.is_private.is_(False),
-            Post.type == PostType.POST
-        )
+        if isinstance(friends_result, BaseException):
+            raise friends_result
+        friends = friends_result
+
+        # Degrade to a friends-only feed when the following list is unavailable
+        following_ids = set()
+        if isinstance(following_result, BaseException):
+            logger.warning(f"Following list unavailable for user {user_id}: {following_result}")
+        else:
+            following_ids = following_result
+
+        only_following = following_ids - friends
+
+        # Get Posts (ordered by newest first)
+        # Each branch applies the keyset predicate, orders and limits on its own,
+        # so it only needs its newest rows from the (user_id, type, is_private,
+        # created_at) index rather than every matching post.
+        keyset = [tuple_(Post.created_at, Post.id) < tuple_(*after)] if after else []
+        branch_limit = limit if after else skip + limit
+
+        def newest(user_ids, is_private: bool):
+            branch = (
+                select(Post)
+                .where(
+                    Post.user_id.in_(user_ids),
+                    Post.is_private.is_(is_private),
+                    Post.type == PostType.POST,
+                    Post.deleted_at.is_(None),
+                    *keyset
+                )
+                .order_by(Post.created_at.desc(), Post.id.desc())
+                .limit(branch_limit)
+                .subquery()
+            )
+            return select(branch)
 
-        public_from_following = db.query(Post).filter(
-            Post.user_id.in_(only_following),
-            Post.is_private.is_(False),
-            Post.type == PostType.POST
-        )
+        private_from_friends = newest(friends, True)
+        public_from_friends = newest(friends, False)
+        public_from_following = newest(only_following, False)
+
+        combined = aliased(Post, union_all(private_from_friends, public_from_friends, public_from_following).subquery())
+        query = select(combined).order_by(combined.created_at.desc(), combined.id.desc())
+        if not after:
+            query = query.offset(skip)
+        posts = (await db.scalars(query.limit(limit))).all()
 
-        combined = private_from_friends.union_all(public_from_friends).union_all(public_from_following)
-        posts = combined.order_by(Post.created_at.desc()).offset(skip).limit(limit).all()
+        next_cursor = encode_cursor(posts[-1].created_at, posts[-1].id) if len(posts) == limit else None
 
         return [
             {
@@ -181,50 +290,96 @@ async def get_recommended_posts(
                 "type": p.type.value if p.type else None
             }
             for p in posts
-        ]
+        ], next_cursor
 
+    except HTTPException:
+        raise
     except httpx.HTTPStatusError as e:
         raise HTTPException(status_code=e.response.status_code, detail="External service failure")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Feed generation failed: {str(e)}")
 
 
-async def get_public_posts_by_username(username: str, db: Session) -> list[dict]:
-    try:
-        async with httpx.AsyncClient() as client:
-            # Step 1: Get user profile from Auth service
-            res = await client.get(
-                f"{settings.AUTH_SERVICE_URL}/auth/username-exists/{username}"
-            )
+async def resolve_username(username: str) -> int:
+    user_id = await username_cache.get(username)
+    if user_id is None:
+        try:
+            res = await get_client().get(f"{settings.AUTH_SERVICE_URL}/auth/username-exists/{username}")
             res.raise_for_status()
-            data = res.json()
-
-            if not data.get("exists"):
-                raise HTTPException(status_code=404, detail="Username not found")
-
-            user_id = data.get("user_id")
-            if not user_id:
-                raise HTTPException(status_code=404, detail="User ID not found")
-
-        # Step 2: Query public posts from that user
-        posts = db.query(Post).filter(
+        except httpx.HTTPStatusError as e:
+            raise HTTPException(status_code=e.response.status_code, detail="Failed to resolve user")
+        except httpx.HTTPError:
+            raise HTTPException(status_code=500, detail="Failed to resolve user")
+
+        data = res.json()
+        user_id = data.get("user_id") if data.get("exists") else None
+        user_id = user_id or username_cache.MISSING
+        await username_cache.put(username, user_id)
+
+    if user_id == username_cache.MISSING:
+        raise HTTPException(status_code=404, detail="Username not found")
+    return user_id
+
+
+def _etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+async def get_public_posts_by_username(
+    username: str,
+    db: AsyncSession,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = None
+) -> tuple[Optional[list[dict]], Optional[str], str]:
+    """Returns (posts, next_cursor, etag); posts is None when the caller's copy is still current."""
+    user_id = await resolve_username(username)
+
+    version = await public_posts_cache.get_version(user_id)
+    if version is not None:
+        etag = f'"{user_id}-{version}"'
+        if _etag_matches(etag, if_none_match):
+            return None, None, etag
+        cached = await public_posts_cache.get_page(user_id, version, limit, cursor)
+        if cached is not None:
+            return cached[0], cached[1], etag
+
+    after = decode_cursor(cursor) if cursor else None
+    posts = (await db.scalars(
+        select(Post).where(
             Post.user_id == user_id,
-            Post.is_private == False,
-            Post.type == PostType.POST
-        ).order_by(Post.created_at.desc()).all()
-
-        return [
-            {
-                "id": p.id,
-                "asset_url": p.asset_url,
-                "user_id": p.user_id,
-                "is_private": p.is_private,
-                "type": p.type.value if p.type else None
-            }
-            for p in posts
-        ]
-
-    except httpx.HTTPStatusError as e:
-        raise HTTPException(status_code=e.response.status_code, detail="Failed to resolve user")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch posts: {str(e)}")
+            Post.is_private.is_(False),
+            Post.type == PostType.POST,
+            Post.deleted_at.is_(None),
+            *([tuple_(Post.created_at, Post.id) < tuple_(*after)] if after else [])
+        ).order_by(Post.created_at.desc(), Post.id.desc()).limit(limit)
+    )).all()
+
+    next_cursor = encode_cursor(posts[-1].created_at, posts[-1].id) if len(posts) == limit else None
+    page = [
+        {
+            "id": p.id,
+            "asset_url": p.asset_url,
+            "user_id": p.user_id,
+            "is_private": p.is_private,
+            "type": p.type.value if p.type else None
+        }
+        for p in posts
+    ]
+
+    if version is not None:
+        await public_posts_cache.set_page(user_id, version, limit, cursor, page, next_cursor)
+    else:
+        # No Redis: fall back to a content hash, which still spares the transfer
+        etag = f'"{hashlib.sha1(json.dumps([page, next_cursor]).encode()).hexdigest()}"'
+        if _etag_matches(etag, if_none_match):
+            return None, None, etag
+    return page, next_cursor, etag
+
+
+async def handle_user_updated(event: dict):
+    payload = event["payload"]
+    await username_cache.rename(payload["user_id"], payload.get("username"), payload.get("previous_username"))
@@ -0,0 +1,336 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+import httpx
+from sqlalchemy import select, tuple_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from app.config.config import settings
+from app.db.session import AsyncSessionLocal
+from app.enums.post_type_enum import PostType
+from app.models.post import Post
+from app.services.post_service import fetch_friend_ids, fetch_following_ids, get_posts_by_ids
+from app.utils.cursor_utils import encode_cursor, decode_cursor
+from app.utils.http_client import get_client
+from app.utils.redis_client import redis_client
+from app.utils import event_bus
+
+logger = logging.getLogger(__name__)
+
+# Authors with more followers than TIMELINE_FANOUT_LIMIT; their public posts are
+# merged into followers' feeds at read time instead of being pushed on write.
+CELEBRITIES_KEY = "timeline:celebrities"
+# Bumped whenever the celebrity set changes, which invalidates every reader's cached
+# followed-celebrity set at once
+CELEBRITIES_VERSION_KEY = "timeline:celebrities:version"
+
+# A rebuild keeps live deliveries this recent; older posts are covered by its snapshot
+REBUILD_OVERLAP_MS = 60_000
+
+# Timeline members are "<post_id>:<f|o>": delivered to a friend or to a (non-friend) follower.
+# Follower deliveries are hidden again if the post is later made private.
+FRIEND = "f"
+FOLLOWER = "o"
+
+
+def _timeline_key(user_id: int) -> str:
+    return f"timeline:{user_id}"
+
+
+def _ready_key(user_id: int) -> str:
+    return f"timeline:ready:{user_id}"
+
+
+def _rebuild_lock_key(user_id: int) -> str:
+    return f"timeline:rebuilding:{user_id}"
+
+
+def _followed_celebrities_key(user_id: int) -> str:
+    return f"timeline:followed-celebrities:{user_id}"
+
+
+def _score(created_at: datetime) -> int:
+    # Integer milliseconds keep scores exact; ties are broken by post id after hydration
+    return int(created_at.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _enabled() -> bool:
+    return settings.TIMELINE_ENABLED and redis_client is not None
+
+
+def _serialize(p: Post) -> dict:
+    return {
+        "id": p.id,
+        "asset_url": p.asset_url,
+        "is_private": p.is_private,
+        "user_id": p.user_id,
+        "type": p.type.value if p.type else None,
+        "created_at": p.created_at
+    }
+
+
+async def _fetch_follower_ids(client: httpx.AsyncClient, token: str, user_id: int, limit: int) -> tuple[set[int], bool]:
+    """Returns the author's followers and whether the list is complete (within ``limit``)."""
+    follower_ids = set()
+    params = {"limit": 1000}
+    while True:
+        res = await client.get(
+            f"{settings.AUTH_SERVICE_URL}/auth/followers/{user_id}",
+            params=params,
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        res.raise_for_status()
+        body = res.json()
+        follower_ids.update(f["id"] for f in body.get("followers", []) if "id" in f)
+        if len(follower_ids) > limit:
+            return follower_ids, False
+        if not body.get("next_cursor"):
+            return follower_ids, True
+        params["after_id"] = body["next_cursor"]
+
+
+async def fan_out_posts(post_ids: list[int], author_id: int, is_private: bool, created_at: datetime, token: str):
+    if not _enabled():
+        return
+
+    try:
+        client = get_client()
+        targets = {friend_id: FRIEND for friend_id in await fetch_friend_ids(client, token, author_id)}
+
+        if not is_private:
+            followers, complete = await _fetch_follower_ids(client, token, author_id, settings.TIMELINE_FANOUT_LIMIT)
+            if complete:
+                for follower_id in followers:
+                    targets.setdefault(follower_id, FOLLOWER)
+                changed = await redis_client.srem(CELEBRITIES_KEY, author_id)
+            else:
+                changed = await redis_client.sadd(CELEBRITIES_KEY, author_id)
+            if changed:
+                await redis_client.incr(CELEBRITIES_VERSION_KEY)
+
+        score = _score(created_at)
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for user_id, tag in targets.items():
+                key = _timeline_key(user_id)
+                pipe.zadd(key, {f"{post_id}:{tag}": score for post_id in post_ids})
+                pipe.zremrangebyrank(key, 0, -settings.TIMELINE_MAX_LENGTH - 1)
+                pipe.expire(key, settings.TIMELINE_TTL_SECONDS)
+            await pipe.execute()
+    except Exception as e:
+        logger.error(f"Timeline fan-out failed for posts {post_ids}: {e}")
+
+
+def _keyset_filter(after: Optional[tuple[datetime, int]]):
+    return [tuple_(Post.created_at, Post.id) < tuple_(*after)] if after else []
+
+
+def _before(post: dict, after: Optional[tuple[datetime, int]]) -> bool:
+    return after is None or (post["created_at"], post["id"]) < after
+
+
+async def _read_timeline_entries(
+    db: AsyncSession, user_id: int, limit: int, after: Optional[tuple[datetime, int]]
+) -> tuple[list[dict], bool]:
+    """Hydrates up to ``limit`` visible posts; the flag is True if the capped timeline ran out."""
+    key = _timeline_key(user_id)
+    max_score = _score(after[0]) if after else "+inf"
+    batch_size = limit * 2
+    offset = 0
+    posts = []
+
+    while len(posts) < limit:
+        members = await redis_client.zrevrangebyscore(key, max_score, "-inf", start=offset, num=batch_size)
+        if not members:
+            break
+        offset += len(members)
+
+        entries = []
+        for member in members:
+            post_id, _, tag = member.partition(":")
+            entries.append((int(post_id), tag))
+
+        rows = {p["id"]: p for p in await get_posts_by_ids(db, [pid for pid, _ in entries])}
+        for post_id, tag in entries:
+            post = rows.get(post_id)
+            # Deleted posts, and posts made private after a follower delivery, are skipped
+            if post is None or post["type"] != PostType.POST.value or (post["is_private"] and tag != FRIEND):
+                continue
+            if _before(post, after):
+                posts.append(post)
+
+        if len(members) < batch_size:
+            break
+
+    exhausted = len(posts) < limit and await redis_client.zcard(key) >= settings.TIMELINE_MAX_LENGTH
+    return posts[:limit], exhausted
+
+
+async def _followed_celebrities(token: str, user_id: int) -> set[int]:
+    key = _followed_celebrities_key(user_id)
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.smembers(CELEBRITIES_KEY)
+        pipe.get(CELEBRITIES_VERSION_KEY)
+        pipe.get(key)
+        celebrities, version, cached = await pipe.execute()
+    if not celebrities:
+        return set()
+
+    celebrities = {int(c) for c in celebrities}
+    version = version or "0"
+
+    # Cached as "<version>|<id>,<id>,..."; follow events delete it, celebrity changes outdate it
+    if cached is not None:
+        cached_version, _, ids = cached.partition("|")
+        if cached_version == version:
+            return {int(i) for i in ids.split(",") if i} & celebrities
+
+    try:
+        following = await fetch_following_ids(get_client(), token, user_id)
+    except Exception as e:
+        logger.warning(f"Following list unavailable for user {user_id}: {e}")
+        return set()
+
+    followed = celebrities & following
+    await redis_client.set(key, f"{version}|{','.join(map(str, sorted(followed)))}", ex=settings.TIMELINE_TTL_SECONDS)
+    return followed
+
+
+async def _read_celebrity_posts(
+    db: AsyncSession, authors: set[int], limit: int, after: Optional[tuple[datetime, int]]
+) -> list[dict]:
+    if not authors:
+        return []
+
+    posts = (await db.scalars(
+        select(Post).where(
+            Post.user_id.in_(authors),
+            Post.is_private.is_(False),
+            Post.type == PostType.POST,
+            Post.deleted_at.is_(None),
+            *_keyset_filter(after)
+        ).order_by(Post.created_at.desc(), Post.id.desc()).limit(limit)
+    )).all()
+    return [_serialize(p) for p in posts]
+
+
+async def get_timeline(
+    db: AsyncSession, token: str, user_id: int, limit: int, cursor: Optional[str] = None
+) -> Optional[tuple[list[dict], Optional[str]]]:
+    """Reads the precomputed feed; returns None when the caller must compute it instead."""
+    if not _enabled():
+        return None
+
+    try:
+        if not await redis_client.exists(_ready_key(user_id)):
+            return None
+
+        after = decode_cursor(cursor) if cursor else None
+        # The session is used by one coroutine at a time; only the graph lookup runs alongside it
+        (timeline_posts, exhausted), celebrities = await asyncio.gather(
+            _read_timeline_entries(db, user_id, limit, after),
+            _followed_celebrities(token, user_id),
+        )
+        celebrity_posts = await _read_celebrity_posts(db, celebrities, limit, after)
+    except Exception as e:
+        logger.warning(f"Timeline read failed for user {user_id}: {e}")
+        return None
+
+    if exhausted:
+        # Older than the capped timeline reaches; compute the rest on read
+        return None
+
+    merged = {p["id"]: p for p in timeline_posts + celebrity_posts}
+    posts = sorted(merged.values(), key=lambda p: (p["created_at"], p["id"]), reverse=True)[:limit]
+    next_cursor = encode_cursor(posts[-1]["created_at"], posts[-1]["id"]) if len(posts) == limit else None
+    return posts, next_cursor
+
+
+async def _load_recent_posts(friends: set[int], only_following: set[int]) -> list[Post]:
+    async with AsyncSessionLocal() as db:
+        from_friends = select(Post).where(
+            Post.user_id.in_(friends),
+            Post.type == PostType.POST,
+            Post.deleted_at.is_(None)
+        )
+        public_from_following = select(Post).where(
+            Post.user_id.in_(only_following),
+            Post.is_private.is_(False),
+            Post.type == PostType.POST,
+            Post.deleted_at.is_(None)
+        )
+        combined = aliased(Post, union_all(from_friends, public_from_following).subquery())
+        return (await db.scalars(
+            select(combined)
+            .order_by(combined.created_at.desc(), combined.id.desc())
+            .limit(settings.TIMELINE_MAX_LENGTH)
+        )).all()
+
+
+async def rebuild_timeline(token: str, user_id: int):
+    """Materializes a user's timeline from the social graph, e.g. after a cold start."""
+    if not _enabled():
+        return
+
+    try:
+        if not await redis_client.set(_rebuild_lock_key(user_id), 1, nx=True, ex=60):
+            return
+
+        started = _score(datetime.now(timezone.utc))
+        client = get_client()
+        friends, following = await asyncio.gather(
+            fetch_friend_ids(client, token, user_id),
+            fetch_following_ids(client, token, user_id),
+        )
+        posts = await _load_recent_posts(friends, following - friends)
+
+        key = _timeline_key(user_id)
+        staging = f"{key}:rebuild"
+        recent = f"{key}:recent"
+
+        # Stage the snapshot under a temporary key, so the live timeline stays readable
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.delete(staging)
+            if posts:
+                pipe.zadd(staging, {
+                    f"{p.id}:{FRIEND if p.user_id in friends else FOLLOWER}": _score(p.created_at)
+                    for p in posts
+                })
+                # Left behind if this rebuild dies before the swap
+                pipe.expire(staging, 60)
+            await pipe.execute()
+
+        # Swap atomically, carrying over fan-outs that landed while the snapshot was loading
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.zrangestore(recent, key, started - REBUILD_OVERLAP_MS, "+inf", byscore=True)
+            if posts:
+                pipe.zunionstore(staging, [staging, recent], aggregate="MAX")
+                pipe.rename(staging, key)
+            else:
+                pipe.zunionstore(key, [recent])
+            pipe.delete(recent)
+            pipe.zremrangebyrank(key, 0, -settings.TIMELINE_MAX_LENGTH - 1)
+            pipe.expire(key, settings.TIMELINE_TTL_SECONDS)
+            pipe.set(_ready_key(user_id), 1, ex=settings.TIMELINE_TTL_SECONDS)
+            pipe.delete(_rebuild_lock_key(user_id))
+            await pipe.execute()
+    except Exception as e:
+        logger.error(f"Timeline rebuild failed for user {user_id}: {e}")
+
+
+async def invalidate_timelines(*user_ids: int):
+    """Drops the ready markers so the next feed read rebuilds these timelines from the graph."""
+    if not _enabled() or not user_ids:
+        return
+    await redis_client.delete(*[_ready_key(uid) for uid in user_ids])
+
+
+async def handle_graph_event(event: dict):
+    # New or removed edges change whose posts belong in a timeline
+    payload = event["payload"]
+    if event["type"] == event_bus.FRIENDSHIP_ACCEPTED:
+        await invalidate_timelines(payload["user_id"], payload["friend_id"])
+    else:
+        await invalidate_timelines(payload["follower_id"])
+        if _enabled():
+            await redis_client.delete(_followed_celebrities_key(payload["follower_id"]))
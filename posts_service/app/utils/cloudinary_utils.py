@@ -1,5 +1,5 @@
 import cloudinary
-import cloudinary.uploader
+import cloudinary.api
 from app.config.config import settings
 
 cloudinary.config(
@@ -7,6 +7,9 @@ cloudinary.config(
     api_key=settings.CLOUDINARY_API_KEY,
     api_secret=settings.CLOUDINARY_API_SECRET
 )
+if settings.CLOUDINARY_API_URL:
+    # Points the API client elsewhere, e.g. at scripts/cloudinary_stub.py
+    cloudinary.config(upload_prefix=settings.CLOUDINARY_API_URL)
 
 CLOUD_NAME = settings.CLOUDINARY_CLOUD_NAME
 UPLOAD_PRESET = settings.CLOUDINARY_UNSIGNED_PRESET
@@ -17,10 +20,13 @@ def generate_upload_url():
         "upload_preset": UPLOAD_PRESET,
     }
 
-def delete_asset_from_cloudinary(public_id: str):
-    result = cloudinary.uploader.destroy(public_id, resource_type="auto")
-    if result.get("result") not in ("ok", "not_found"):
-        raise Exception(f"Failed to delete Cloudinary asset: {result}")
+def public_id_from_url(asset_url: str) -> str:
+    return f"everstory/{asset_url.split('/')[-1].split('.')[0]}"
+
+def delete_assets_from_cloudinary(public_ids: list[str]) -> dict[str, str]:
+    """Bulk delete (at most 100 ids per call); returns Cloudinary's status per public id."""
+    result = cloudinary.api.delete_resources(public_ids, resource_type="image", type="upload")
+    return result.get("deleted", {})
 
 def get_download_url(public_id: str):
     return f"https://res.cloudinary.com/{CLOUD_NAME}/image/upload/{public_id}.jpg"
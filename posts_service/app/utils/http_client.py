@@ -0,0 +1,30 @@
+from typing import Optional
+import httpx
+from app.config.config import settings
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+async def init_client():
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+            timeout=settings.HTTP_TIMEOUT,
+        )
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    if _client is None:
+        raise RuntimeError("HTTP client is not initialised")
+    return _client
@@ -0,0 +1,22 @@
+import uuid
+from typing import Optional
+from app.models.outbox_event import OutboxEvent
+from app.utils import event_bus
+
+
+def add_event(db, event_type: str, payload: dict) -> Optional[str]:
+    """Stages an event in the caller's transaction; the relay publishes it once committed."""
+    if event_bus.publisher is None:
+        return None
+    event_id = uuid.uuid4().hex
+    db.add(OutboxEvent(event_id=event_id, event_type=event_type, payload=event_bus.encode_payload(payload)))
+    return event_id
+
+
+def to_event(row: OutboxEvent) -> dict:
+    return {
+        "id": row.event_id,
+        "type": row.event_type,
+        "occurred_at": row.created_at.isoformat(),
+        "payload": row.payload,
+    }
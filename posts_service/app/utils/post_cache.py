@@ -0,0 +1,64 @@
+import json
+import logging
+from datetime import datetime
+from app.config.config import settings
+from app.utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Entries are compact JSON arrays: [user_id, asset_url, is_private, type, created_at]
+
+
+def _key(post_id: int) -> str:
+    return f"post:{post_id}"
+
+
+def _encode(post: dict) -> str:
+    return json.dumps(
+        [post["user_id"], post["asset_url"], post["is_private"], post["type"], post["created_at"].isoformat()],
+        separators=(",", ":")
+    )
+
+
+def _decode(post_id: int, raw: str) -> dict:
+    user_id, asset_url, is_private, type, created_at = json.loads(raw)
+    return {
+        "id": post_id,
+        "user_id": user_id,
+        "asset_url": asset_url,
+        "is_private": is_private,
+        "type": type,
+        "created_at": datetime.fromisoformat(created_at),
+    }
+
+
+async def get_many(post_ids: list[int]) -> dict[int, dict]:
+    if redis_client is None or not post_ids:
+        return {}
+    try:
+        values = await redis_client.mget([_key(pid) for pid in post_ids])
+    except Exception as e:
+        logger.warning(f"Post cache read failed: {e}")
+        return {}
+    return {pid: _decode(pid, raw) for pid, raw in zip(post_ids, values) if raw is not None}
+
+
+async def set_many(posts: list[dict]):
+    if redis_client is None or not posts:
+        return
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for post in posts:
+                pipe.set(_key(post["id"]), _encode(post), ex=settings.POST_CACHE_TTL_SECONDS)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Post cache write failed: {e}")
+
+
+async def invalidate(post_id: int):
+    if redis_client is None:
+        return
+    try:
+        await redis_client.delete(_key(post_id))
+    except Exception as e:
+        logger.warning(f"Post cache invalidation failed for post {post_id}: {e}")
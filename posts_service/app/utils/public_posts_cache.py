@@ -0,0 +1,74 @@
+import json
+import logging
+import time
+from typing import Optional
+from app.config.config import settings
+from app.utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Pages of a user's public post listing. Every page key embeds the user's listing
+# version, so bumping the version invalidates all pages at once and doubles as
+# the ETag. Versions start at a millisecond timestamp, so a version lost with
+# Redis data is never reissued for different content.
+
+
+def _version_key(user_id: int) -> str:
+    return f"public_posts:version:{user_id}"
+
+
+def _page_key(user_id: int, version: int, limit: int, cursor: Optional[str]) -> str:
+    return f"public_posts:{user_id}:{version}:{limit}:{cursor or ''}"
+
+
+async def get_version(user_id: int) -> Optional[int]:
+    if redis_client is None:
+        return None
+    try:
+        version = await redis_client.get(_version_key(user_id))
+        if version is None:
+            await redis_client.set(_version_key(user_id), int(time.time() * 1000), nx=True)
+            version = await redis_client.get(_version_key(user_id))
+    except Exception as e:
+        logger.warning(f"Public posts version read failed: {e}")
+        return None
+    return int(version)
+
+
+async def bump(user_id: int):
+    if redis_client is None:
+        return
+    try:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.set(_version_key(user_id), int(time.time() * 1000), nx=True)
+            pipe.incr(_version_key(user_id))
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Public posts invalidation failed for user {user_id}: {e}")
+
+
+async def get_page(user_id: int, version: int, limit: int, cursor: Optional[str]) -> Optional[tuple[list[dict], Optional[str]]]:
+    if redis_client is None:
+        return None
+    try:
+        raw = await redis_client.get(_page_key(user_id, version, limit, cursor))
+    except Exception as e:
+        logger.warning(f"Public posts cache read failed: {e}")
+        return None
+    if raw is None:
+        return None
+    page = json.loads(raw)
+    return page["posts"], page["next_cursor"]
+
+
+async def set_page(user_id: int, version: int, limit: int, cursor: Optional[str], posts: list[dict], next_cursor: Optional[str]):
+    if redis_client is None:
+        return
+    try:
+        await redis_client.set(
+            _page_key(user_id, version, limit, cursor),
+            json.dumps({"posts": posts, "next_cursor": next_cursor}, separators=(",", ":")),
+            ex=settings.PUBLIC_POSTS_CACHE_TTL_SECONDS
+        )
+    except Exception as e:
+        logger.warning(f"Public posts cache write failed: {e}")
@@ -0,0 +1,5 @@
+from redis.asyncio import Redis
+from app.config.config import settings
+
+# Timelines and caches are optional; without REDIS_URL the service falls back to Postgres
+redis_client = Redis.from_url(settings.REDIS_URL, decode_responses=True) if settings.REDIS_URL else None
@@ -0,0 +1,113 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from redis.asyncio import Redis
+from app.config.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class TokenVerificationCache:
+    """Bounded LRU of verified tokens, keyed by token hash.
+
+    Entries expire after ``ttl_seconds`` or at the token's ``exp``, whichever
+    comes first, and can be dropped early when auth_service revokes a token.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = hash_token(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, token: str, value: dict, exp: Optional[float] = None):
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        if expires_at <= now or self.max_size <= 0:
+            return
+
+        key = hash_token(token)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, token_hash: str):
+        with self._lock:
+            self._entries.pop(token_hash, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Without the revocation channel a logged-out token would keep passing the
+# cache until its entry expired, so caching is off unless REDIS_URL is set
+token_cache = TokenVerificationCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE if settings.REDIS_URL else 0,
+    ttl_seconds=settings.TOKEN_CACHE_TTL_SECONDS,
+)
+
+_listener_task: Optional[asyncio.Task] = None
+
+
+async def _listen_for_revocations():
+    while True:
+        client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+        try:
+            pubsub = client.pubsub()
+            await pubsub.subscribe(settings.TOKEN_REVOCATION_CHANNEL)
+            # Revocations may have been missed while disconnected
+            token_cache.clear()
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    token_cache.invalidate(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Token revocation listener disconnected: {e}")
+            token_cache.clear()
+            await asyncio.sleep(1)
+        finally:
+            await client.aclose()
+
+
+def start_revocation_listener():
+    global _listener_task
+    if settings.REDIS_URL and _listener_task is None:
+        _listener_task = asyncio.create_task(_listen_for_revocations())
+
+
+async def stop_revocation_listener():
+    global _listener_task
+    if _listener_task is not None:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except asyncio.CancelledError:
+            pass
+        _listener_task = None
@@ -1,25 +1,38 @@
 import httpx
-from fastapi import HTTPException, Security
+from fastapi import HTTPException, Request, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from jose import jwt
 from app.config.config import settings
+from app.utils.token_cache import token_cache
+from app.utils.http_client import get_client
+from app.utils.identity_headers import get_trusted_identity
 
 security = HTTPBearer()
 
 
-async def verify_token(credentials: HTTPAuthorizationCredentials = Security(security)) -> dict:
+async def verify_token(request: Request, credentials: HTTPAuthorizationCredentials = Security(security)) -> dict:
+    # Identity already verified and signed by the gateway
+    trusted = get_trusted_identity(request, credentials.credentials)
+    if trusted is not None:
+        return {**trusted, "token": credentials.credentials}
+
+    cached = token_cache.get(credentials.credentials)
+    if cached is not None:
+        return {**cached, "token": credentials.credentials}
+
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{settings.AUTH_VERIFY_URL}",
-                headers={"Authorization": f"Bearer {credentials.credentials}"}
-            )
-            response.raise_for_status()
-            payload = response.json()
-            return {
-                "id": payload["id"],
-                "role": payload.get("role"),
-                "token": credentials.credentials
-            }
+        response = await get_client().get(
+            f"{settings.AUTH_VERIFY_URL}",
+            headers={"Authorization": f"Bearer {credentials.credentials}"}
+        )
+        response.raise_for_status()
+        payload = response.json()
+        user = {
+            "id": payload["id"],
+            "role": payload.get("role"),
+        }
     except httpx.HTTPStatusError as e:
         raise HTTPException(status_code=e.response.status_code, detail="Invalid or expired token")
-    
\ No newline at end of file
+
+    token_cache.set(credentials.credentials, user, exp=jwt.get_unverified_claims(credentials.credentials).get("exp"))
+    return {**user, "token": credentials.credentials}
@@ -0,0 +1,49 @@
+import logging
+from typing import Optional
+from app.config.config import settings
+from app.utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+# username -> user_id, kept current by user.updated events and bounded by a TTL.
+# Unknown usernames are cached as 0 for a short while so misses don't reach auth.
+MISSING = 0
+
+
+def _key(username: str) -> str:
+    return f"username:{username}"
+
+
+async def get(username: str) -> Optional[int]:
+    if redis_client is None:
+        return None
+    try:
+        user_id = await redis_client.get(_key(username))
+    except Exception as e:
+        logger.warning(f"Username cache read failed: {e}")
+        return None
+    return int(user_id) if user_id is not None else None
+
+
+async def put(username: str, user_id: int):
+    if redis_client is None:
+        return
+    ttl = settings.USERNAME_CACHE_TTL_SECONDS if user_id != MISSING else settings.USERNAME_MISS_TTL_SECONDS
+    try:
+        await redis_client.set(_key(username), user_id, ex=ttl)
+    except Exception as e:
+        logger.warning(f"Username cache write failed: {e}")
+
+
+async def rename(user_id: int, username: Optional[str], previous_username: Optional[str]):
+    if redis_client is None:
+        return
+    try:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            if previous_username and previous_username != username:
+                pipe.delete(_key(previous_username))
+            if username:
+                pipe.set(_key(username), user_id, ex=settings.USERNAME_CACHE_TTL_SECONDS)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Username cache update failed for user {user_id}: {e}")
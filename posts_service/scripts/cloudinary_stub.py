@@ -0,0 +1,60 @@
+"""Local stand-in for Cloudinary's bulk delete API, for exercising the asset deletion worker.
+
+    python scripts/cloudinary_stub.py --port 8099 --fail-rate 0.2
+
+Then run posts_service with CLOUDINARY_API_URL=http://localhost:8099. Only
+DELETE /v1_1/<cloud>/resources/image/upload is implemented; --fail-rate
+answers that share of calls with a 500 so retries and dead-lettering can be
+observed.
+"""
+import argparse
+import json
+import random
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class CloudinaryStub(BaseHTTPRequestHandler):
+    fail_rate = 0.0
+
+    def _reply(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_DELETE(self):
+        url = urlparse(self.path)
+        if not url.path.endswith("/resources/image/upload"):
+            return self._reply(404, {"error": {"message": f"Unsupported path {url.path}"}})
+        if random.random() < self.fail_rate:
+            return self._reply(500, {"error": {"message": "Simulated failure"}})
+
+        params = parse_qs(url.query)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            body = self.rfile.read(length).decode()
+            if self.headers.get("Content-Type", "").startswith("application/json"):
+                params.update({k: v if isinstance(v, list) else [v] for k, v in json.loads(body).items()})
+            else:
+                params.update(parse_qs(body))
+
+        public_ids = params.get("public_ids[]", []) + params.get("public_ids", [])
+        print(f"delete {len(public_ids)} asset(s): {public_ids}")
+        self._reply(200, {"deleted": {pid: "deleted" for pid in public_ids}, "partial": False})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    CloudinaryStub.fail_rate = args.fail_rate
+    ThreadingHTTPServer(("0.0.0.0", args.port), CloudinaryStub).serve_forever()
+
+
+if __name__ == "__main__":
+    main()